@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+
+from users.constants import ROLE_CLAIM, SUPERUSER_CLAIM, USERNAME_CLAIM
+from users.tokens import is_revoked
+
+User = get_user_model()
+
+
+class RoleTokenUser(TokenUser):
+    """
+    Пользователь, восстановленный из access-токена.
+    Роль и права для проверки разрешений берутся из токена,
+    запись из базы загружается только при обращении к остальным полям.
+    """
+
+    @cached_property
+    def username(self):
+        return self.token[USERNAME_CLAIM]
+
+    @cached_property
+    def role(self):
+        return self.token[ROLE_CLAIM]
+
+    @cached_property
+    def is_superuser(self):
+        return self.token.get(SUPERUSER_CLAIM, False)
+
+    @property
+    def is_admin(self):
+        return self.role == User.Role.ADMIN or self.is_superuser
+
+    @property
+    def is_moderator(self):
+        return self.role == User.Role.MODERATOR
+
+    @cached_property
+    def instance(self):
+        try:
+            return User.objects.get(pk=self.pk)
+        except User.DoesNotExist:
+            raise AuthenticationFailed(
+                'Пользователь не найден.', code='user_not_found'
+            )
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.instance, name)
+
+
+class RoleTokenAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без запроса к таблице пользователей
+    для токенов с ролью (их выдаёт TokenView). Токены без роли
+    обрабатываются как в JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        if ROLE_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        if is_revoked(validated_token):
+            raise AuthenticationFailed('Токен отозван.', code='token_revoked')
+        return RoleTokenUser(validated_token)
+
+
+def get_user_instance(user):
+    """Модель пользователя запроса, при необходимости загруженная из базы."""
+    if isinstance(user, RoleTokenUser):
+        return user.instance
+    return user
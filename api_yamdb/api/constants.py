@@ -3,3 +3,10 @@ MIN_SCORE: int = 1
 
 MAX_LENGTH_EMAIL: int = 254
 MAX_LENGTH_NAME: int = 150
+
+REFERENCE_CACHE_TIMEOUT: int = 60 * 15
+LEADERBOARD_LIMIT: int = 10
+EXACT_COUNT_LIMIT: int = 1000
+COUNT_CACHE_TIMEOUT: int = 60 * 5
+HISTOGRAM_PARAM: str = 'histogram'
+THROTTLE_BUDGET_US: int = 200
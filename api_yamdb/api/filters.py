@@ -1,14 +1,35 @@
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+from rest_framework.settings import api_settings
 
 from reviews.models import Title
+from reviews.search import search_names, search_titles
+
+
+class CharInFilter(filters.BaseInFilter, filters.CharFilter):
+    """Фильтр по списку значений через запятую."""
 
 
 class TitleFilter(filters.FilterSet):
-    """Собственный фильтр для TitleViewSet."""
+    """
+    Собственный фильтр для TitleViewSet.
+    Жанры проверяются подзапросами EXISTS, а не соединением
+    с промежуточной таблицей, поэтому строки не дублируются.
+    Рейтинг и число отзывов хранятся в самом произведении.
+    """
 
-    genre = filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='exact'
+    GENRE_MATCH_ANY = 'any'
+    GENRE_MATCH_ALL = 'all'
+
+    genre = filters.CharFilter(method='filter_genre')
+    genre__in = CharInFilter(method='filter_genre_in')
+    genre_match = filters.ChoiceFilter(
+        choices=(
+            (GENRE_MATCH_ANY, 'Любой из жанров'),
+            (GENRE_MATCH_ALL, 'Все жанры'),
+        ),
+        method='filter_genre_match',
     )
     category = filters.CharFilter(
         field_name='group__slug',
@@ -18,6 +39,14 @@ class TitleFilter(filters.FilterSet):
         field_name='year',
         lookup_expr='exact'
     )
+    year__gte = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year__lte = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    rating__gte = filters.NumberFilter(field_name='rating', lookup_expr='gte')
+    rating__lte = filters.NumberFilter(field_name='rating', lookup_expr='lte')
+    min_reviews = filters.NumberFilter(
+        field_name='rating_count',
+        lookup_expr='gte'
+    )
     name = filters.CharFilter(
         field_name='name',
         lookup_expr='exact'
@@ -26,3 +55,89 @@ class TitleFilter(filters.FilterSet):
     class Meta:
         model = Title
         fields = ('genre', 'category', 'year', 'name')
+
+    @staticmethod
+    def has_genre(**lookup):
+        return Exists(Title.genre.through.objects.filter(
+            title=OuterRef('pk'), **lookup
+        ))
+
+    def filter_genre(self, queryset, name, value):
+        return queryset.filter(self.has_genre(genre__slug=value))
+
+    def filter_genre_in(self, queryset, name, value):
+        slugs = set(value) - {''}
+        if not slugs:
+            return queryset
+        if self.form.cleaned_data.get('genre_match') == self.GENRE_MATCH_ALL:
+            for slug in slugs:
+                queryset = queryset.filter(self.has_genre(genre__slug=slug))
+            return queryset
+        return queryset.filter(self.has_genre(genre__slug__in=slugs))
+
+    def filter_genre_match(self, queryset, name, value):
+        # Учитывается в filter_genre_in.
+        return queryset
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """
+    Полнотекстовый поиск по названию и описанию произведений
+    (параметр q), результаты упорядочены по релевантности.
+    """
+
+    search_param = 'q'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param)
+        if query is None:
+            return queryset
+        return search_titles(queryset, query)
+
+
+class NameSearchFilter(BaseFilterBackend):
+    """
+    Поиск по началу или подстроке названия (параметр search)
+    через триграммный индекс.
+    """
+
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param)
+        if query is None:
+            return queryset
+        return search_names(queryset, query)
+
+
+class TitleOrderingFilter(OrderingFilter):
+    """
+    Сортировка произведений (параметр ordering) по хранимым полям,
+    для каждого из которых есть составной индекс с id.
+    Без параметра порядок, заданный вьюсетом или поиском, не меняется.
+    """
+
+    ordering_fields = {
+        'name': 'name',
+        'year': 'year',
+        'rating': 'rating',
+        'review_count': 'rating_count',
+    }
+
+    def get_ordering(self, request, queryset, view):
+        params = request.query_params.get(self.ordering_param)
+        if not params:
+            return None
+        ordering = []
+        for param in params.split(','):
+            param = param.strip()
+            prefix = '-' if param.startswith('-') else ''
+            field = self.ordering_fields.get(param.lstrip('-'))
+            if field:
+                ordering.append(f'{prefix}{field}')
+        if ordering:
+            ordering.append('-id' if ordering[0].startswith('-') else 'id')
+        return ordering or None
+
+    def get_valid_fields(self, queryset, view, context={}):
+        return [(param, param) for param in self.ordering_fields]
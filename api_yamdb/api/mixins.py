@@ -1,9 +1,20 @@
-from rest_framework import mixins, serializers, viewsets
+from hashlib import md5
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import mixins, serializers, status, viewsets
 from rest_framework.fields import CurrentUserDefault
-from rest_framework.filters import SearchFilter
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
 
+from api.constants import REFERENCE_CACHE_TIMEOUT
+from api.filters import NameSearchFilter
 from api.permissions import IsAdminOrReadOnly, IsAuthorOrReadOnly
+from api.throttling import IPThrottle, UsernameThrottle
+from api_yamdb.replicas import primary_reads
+from reviews.models import Title
 
 
 class AuthorFieldMixin(serializers.ModelSerializer):
@@ -32,6 +43,24 @@ class AllowAnyPermissionMixin:
     permission_classes = (AllowAny,)
 
 
+class AuthThrottleMixin:
+    """
+    Миксин ограничивает частоту запросов с одного IP и для одного
+    username; лимиты задаются для throttle_scope вьюсета.
+    """
+
+    throttle_classes = (IPThrottle, UsernameThrottle)
+
+
+class ReplicaReadMixin:
+    """
+    Миксин разрешает выполнять безопасные запросы к вьюсету
+    на репликах базы данных (см. api_yamdb.replicas).
+    """
+
+    replica_reads = True
+
+
 class HTTPMethodsMixin:
     """Миксин определяет http методы, которые будет обрабатывать вьюсет."""
 
@@ -39,16 +68,113 @@ class HTTPMethodsMixin:
 
 
 class SlugSearchFilterMixin:
-    """Миксин добавляет класс фильтрации SearchFilter."""
+    """Миксин добавляет поиск по названию через индекс."""
 
-    filter_backends = (SearchFilter,)
-    search_fields = ('name',)
+    filter_backends = (NameSearchFilter,)
     lookup_field = 'slug'
 
 
+class CachedListMixin:
+    """
+    Миксин кэширует ответы списка по строке запроса.
+    Создание и удаление объектов повышают версию кэша,
+    после чего старые ответы больше не читаются. Ответ для кэша
+    читается из основной базы, а не из отстающей реплики.
+    """
+
+    cache_timeout = REFERENCE_CACHE_TIMEOUT
+
+    def get_cache_version_key(self):
+        return f'{self.basename}:list-version'
+
+    def get_cache_version(self):
+        return cache.get_or_set(self.get_cache_version_key(), 1, None)
+
+    def invalidate_list_cache(self):
+        try:
+            cache.incr(self.get_cache_version_key())
+        except ValueError:
+            cache.set(self.get_cache_version_key(), 1, None)
+
+    def list(self, request, *args, **kwargs):
+        key = (
+            f'{self.basename}:list:{self.get_cache_version()}:'
+            f'{request.get_full_path()}'
+        )
+        data = cache.get(key)
+        if data is None:
+            with primary_reads():
+                data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, self.cache_timeout)
+        return Response(data)
+
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        self.invalidate_list_cache()
+
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+        self.invalidate_list_cache()
+
+
+class ConditionalGetMixin:
+    """
+    Миксин отвечает 304 Not Modified на условные GET-запросы
+    (If-None-Match, If-Modified-Since) по отметке изменения произведения,
+    не сериализуя тело ответа. Вьюсет определяет get_title_id,
+    возвращающий id произведения или None, если проверка не нужна.
+    """
+
+    def get_title_id(self):
+        raise ImproperlyConfigured(
+            f'{type(self).__name__} должен определить get_title_id.'
+        )
+
+    def get_last_modified(self):
+        title_id = self.get_title_id()
+        if title_id is None:
+            return None
+        return Title.objects.filter(
+            pk=title_id
+        ).values_list('modified', flat=True).first()
+
+    def get_etag(self, last_modified):
+        return quote_etag(md5(
+            f'{last_modified.isoformat()}:'
+            f'{self.request.get_full_path()}'.encode()
+        ).hexdigest())
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        last_modified = self.get_last_modified()
+        if last_modified is None:
+            return handler(request, *args, **kwargs)
+        etag = self.get_etag(last_modified)
+        timestamp = int(last_modified.timestamp())
+        response = get_conditional_response(
+            request._request, etag=etag, last_modified=timestamp
+        ) or handler(request, *args, **kwargs)
+        if response.status_code in (status.HTTP_200_OK,
+                                    status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
 class GenreGroupMixin(
+    ReplicaReadMixin,
     AdminPermissionMixin,
     SlugSearchFilterMixin,
+    CachedListMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
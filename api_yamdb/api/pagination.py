@@ -0,0 +1,175 @@
+from functools import partial
+from hashlib import md5
+
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+from api.constants import COUNT_CACHE_TIMEOUT, EXACT_COUNT_LIMIT
+
+
+class EstimatedPage(Page):
+    """Страница, которая знает о следующей без точного числа объектов."""
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+
+class CountedPaginator(Paginator):
+    """
+    Paginator, получающий число объектов и признак его точности
+    из переданной функции. Оценочное число может отставать от таблицы,
+    поэтому номер страницы с ним не сверяется, а наличие следующей
+    страницы определяется по лишней строке выборки.
+    """
+
+    def __init__(self, object_list, per_page, counter, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.counter = counter
+
+    @cached_property
+    def counted(self):
+        return self.counter(self.object_list)
+
+    @property
+    def count(self):
+        return self.counted[0]
+
+    @property
+    def count_exact(self):
+        return self.counted[1]
+
+    def validate_number(self, number):
+        if self.count_exact:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(_('That page number is not an integer'))
+        if number < 1:
+            raise EmptyPage(_('That page number is less than 1'))
+        return number
+
+    def page(self, number):
+        if self.count_exact:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        objects = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not objects and number > 1:
+            raise EmptyPage(_('That page contains no results'))
+        return EstimatedPage(
+            objects[:self.per_page], number, self,
+            has_more=len(objects) > self.per_page,
+        )
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    """
+    Постраничная пагинация без точного COUNT(*) по большим таблицам.
+    Число объектов берётся из счётчика, который ведёт вьюсет
+    (метод get_list_count), иначе считается не дальше EXACT_COUNT_LIMIT
+    строк, а при превышении порога — один раз на COUNT_CACHE_TIMEOUT
+    и отдаётся из кеша; для кеша число считается в основной базе.
+    Признак count_exact в ответе показывает, точное ли число count.
+    """
+
+    exact_count_limit = EXACT_COUNT_LIMIT
+    count_cache_timeout = COUNT_CACHE_TIMEOUT
+
+    @property
+    def django_paginator_class(self):
+        return partial(CountedPaginator, counter=self.get_count)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.view = view
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_count(self, queryset):
+        """Число объектов и признак того, что оно точное."""
+        get_list_count = getattr(self.view, 'get_list_count', None)
+        if get_list_count is not None:
+            return get_list_count(), True
+        queryset = queryset.order_by()
+        count = queryset[:self.exact_count_limit + 1].count()
+        if count <= self.exact_count_limit:
+            return count, True
+        key = md5(str(queryset.query).encode()).hexdigest()
+        return cache.get_or_set(
+            f'pagination-count:{key}',
+            queryset.using(DEFAULT_DB_ALIAS).count,
+            self.count_cache_timeout
+        ), False
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.page.paginator.count,
+            'count_exact': self.page.paginator.count_exact,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class FixedOrderingCursorPagination(CursorPagination):
+    """Курсорная пагинация, не зависящая от фильтров сортировки вьюсета."""
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
+
+
+class OptionalCursorPagination(EstimatedCountPagination):
+    """
+    Постраничная пагинация с включаемым по запросу курсорным режимом.
+    Без параметра cursor работает как EstimatedCountPagination,
+    с параметром cursor (в т.ч. пустым) выдаёт страницы по ключу
+    сортировки без OFFSET и без подсчёта COUNT(*).
+    """
+
+    cursor_query_param = 'cursor'
+    cursor_ordering = ('-id',)
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def get_cursor_paginator(self):
+        paginator = FixedOrderingCursorPagination()
+        paginator.cursor_query_param = self.cursor_query_param
+        paginator.ordering = self.cursor_ordering
+        paginator.page_size = self.page_size
+        return paginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params:
+            return super().paginate_queryset(queryset, request, view)
+        self.cursor_paginator = self.get_cursor_paginator()
+        return self.cursor_paginator.paginate_queryset(
+            queryset, request, view
+        )
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is None:
+            return super().get_paginated_response(data)
+        return self.cursor_paginator.get_paginated_response(data)
+
+
+class TitlePagination(OptionalCursorPagination):
+    """Пагинация произведений, курсор по убыванию id."""
+
+    cursor_ordering = ('-id',)
+
+
+class PubDatePagination(OptionalCursorPagination):
+    """Пагинация отзывов и комментариев, курсор по дате публикации."""
+
+    cursor_ordering = ('pub_date', 'id')
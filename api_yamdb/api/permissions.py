@@ -29,12 +29,13 @@ class IsAuthorOrReadOnly(BasePermission):
     """
     Разрешения: анонимы могут смотреть всё, а CRUD авторизованные юзеры
     и только своё, кому дал право создатель, могут всё.
+    Автор сравнивается по id, без загрузки связанного пользователя.
     """
 
     def has_object_permission(self, request, view, obj):
         return (
             request.method in SAFE_METHODS
-            or obj.author == request.user
+            or obj.author_id == request.user.id
             or request.user.is_admin
             or request.user.is_moderator
             or request.user.is_superuser
@@ -1,12 +1,15 @@
 import re
+import secrets
 
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
-from rest_framework.fields import CurrentUserDefault
+from rest_framework.settings import api_settings
 
-from api.constants import (MAX_LENGTH_EMAIL, MAX_LENGTH_NAME, MAX_SCORE,
-                           MIN_SCORE)
+from api.constants import (HISTOGRAM_PARAM, MAX_LENGTH_EMAIL, MAX_LENGTH_NAME,
+                           MAX_SCORE, MIN_SCORE)
 from api.mixins import AuthorFieldMixin
 from reviews.models import Comment, Genre, Group, Review, Title
 
@@ -29,10 +32,19 @@ class GenreSerializer(serializers.ModelSerializer):
         model = Genre
 
 
+class RatingHistogramField(serializers.Field):
+    """Распределение оценок в виде {оценка: количество отзывов}."""
+
+    def to_representation(self, value):
+        return value.as_dict()
+
+
 class TitleReadSerializer(serializers.ModelSerializer):
     """Сериализатор произведений для чтения."""
 
     rating = serializers.ReadOnlyField()
+    review_count = serializers.ReadOnlyField(source='rating_count')
+    rating_histogram = RatingHistogramField(read_only=True)
     category = GroupSerializer(
         read_only=True,
         source='group',
@@ -44,10 +56,19 @@ class TitleReadSerializer(serializers.ModelSerializer):
 
     class Meta:
         fields = (
-            'id', 'name', 'year', 'rating', 'description', 'genre', 'category'
+            'id', 'name', 'year', 'rating', 'review_count',
+            'rating_histogram', 'description', 'genre', 'category'
         )
         model = Title
 
+    def get_fields(self):
+        """Распределение оценок выводится только по параметру histogram."""
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or HISTOGRAM_PARAM not in request.query_params:
+            fields.pop('rating_histogram')
+        return fields
+
 
 class TitleCreateSerializer(serializers.ModelSerializer):
     """Сериализатор произведений для записи."""
@@ -75,7 +96,7 @@ class ReviewSerializer(AuthorFieldMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Review
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = ('id', 'text', 'author', 'score', 'pub_date', 'comment_count')
 
     def validate_score(self, value):
         if value not in range(MIN_SCORE, MAX_SCORE + 1):
@@ -84,17 +105,29 @@ class ReviewSerializer(AuthorFieldMixin, serializers.ModelSerializer):
             )
         return value
 
-    def validate(self, attrs):
-        title = self.context.get('view').kwargs.get('title_id')
-        if self.instance:
-            return attrs
-        if Review.objects.filter(
-                title=title, author=CurrentUserDefault()(serializer_field=self)
-        ).exists():
-            raise serializers.ValidationError(
-                'Пользователь может оставить только один отзыв к произведению!'
-            )
-        return attrs
+    def create(self, validated_data):
+        """
+        Уникальность отзыва проверяет ограничение unique_review:
+        без предварительного запроса, в том числе при гонке запросов.
+        Review.save() выполняется в транзакции, и при нарушении
+        ограничения она откатывается целиком. Другие нарушения
+        целостности (например, произведение удалено перед вставкой)
+        пробрасываются дальше.
+        """
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                title_id=validated_data['title_id'],
+                author=validated_data['author'],
+            ).exists():
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Пользователь может оставить только один отзыв '
+                    'к произведению!'
+                ]
+            })
 
 
 class CommentSerializer(AuthorFieldMixin, serializers.ModelSerializer):
@@ -125,11 +158,25 @@ class UserRegistrationSerializer(serializers.Serializer):
         return value
 
     def validate(self, attrs):
+        """
+        Находит пользователей с таким email или username одним запросом;
+        в транзакции строки блокируются до конца регистрации.
+        """
         username = attrs.get('username')
         email = attrs.get('email')
 
-        user_by_email = User.objects.filter(email=email).first()
-        user_by_username = User.objects.filter(username=username).first()
+        users = User.objects.filter(
+            Q(email=email) | Q(username=username)
+        ).only('id', 'email', 'username')
+        if transaction.get_connection().in_atomic_block:
+            users = users.select_for_update()
+        users = list(users[:2])
+        user_by_email = next(
+            (user for user in users if user.email == email), None
+        )
+        user_by_username = next(
+            (user for user in users if user.username == username), None
+        )
 
         if user_by_email and user_by_username:
             if user_by_email != user_by_username:
@@ -144,8 +191,26 @@ class UserRegistrationSerializer(serializers.Serializer):
                 'Этот username уже используется.'
             )
 
+        attrs['user'] = user_by_username
         return attrs
 
+    def create(self, validated_data):
+        """
+        Создаёт пользователя или обновляет код подтверждения
+        существующего одним запросом на запись.
+        """
+        code = secrets.token_urlsafe(32)
+        user = validated_data['user']
+        if user is None:
+            return User.objects.create(
+                username=validated_data['username'],
+                email=validated_data['email'],
+                confirmation_code=code,
+            )
+        User.objects.filter(pk=user.pk).update(confirmation_code=code)
+        user.confirmation_code = code
+        return user
+
 
 class TokenObtainSerializer(serializers.Serializer):
     """
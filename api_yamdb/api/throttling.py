@@ -0,0 +1,99 @@
+"""
+Ограничение частоты запросов алгоритмом token bucket.
+
+Состояние корзины (число токенов и время обновления) хранится
+в кеше Django: локально в LocMem, в продакшене — в общем кеше,
+чтобы лимиты действовали сразу для всех процессов. Лимиты задаются
+в REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] в формате DRF ('10/min'):
+число — ёмкость корзины, за указанный период она заполняется целиком.
+Чтение и запись состояния не атомарны, поэтому при одновременных
+запросах лимит может быть превышен на единицы — как и у
+SimpleRateThrottle из DRF.
+"""
+import time
+from collections.abc import Mapping
+from hashlib import md5
+
+from django.core.cache import cache as default_cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, 60): ёмкость корзины и период её заполнения."""
+    if rate is None:
+        return None
+    num, period = rate.split('/')
+    return int(num), PERIODS[period[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Базовый класс: лимит берётся по ключу '<throttle_scope вьюсета>_<kind>',
+    запрос относится к корзине по значению get_bucket_ident.
+    """
+
+    kind = None
+    cache = default_cache
+    timer = time.time
+
+    def get_bucket_ident(self, request):
+        raise NotImplementedError
+
+    def get_rate(self, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if scope is None:
+            return None
+        return parse_rate(
+            api_settings.DEFAULT_THROTTLE_RATES.get(f'{scope}_{self.kind}')
+        )
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        rate = self.get_rate(view)
+        ident = self.get_bucket_ident(request)
+        if rate is None or not ident:
+            return True
+        capacity, period = rate
+        refill = capacity / period
+        key = 'throttle:{}_{}:{}'.format(
+            view.throttle_scope, self.kind, md5(ident.encode()).hexdigest()
+        )
+        now = self.timer()
+        tokens, updated = self.cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill)
+        if tokens < 1:
+            self.wait_seconds = (1 - tokens) / refill
+            return False
+        # За period пустая корзина заполняется целиком, дольше хранить
+        # состояние незачем.
+        self.cache.set(key, (tokens - 1, now), period)
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Лимит на IP-адрес клиента."""
+
+    kind = 'ip'
+
+    def get_bucket_ident(self, request):
+        return self.get_ident(request)
+
+
+class UsernameThrottle(TokenBucketThrottle):
+    """Лимит на username из тела запроса."""
+
+    kind = 'username'
+
+    def get_bucket_ident(self, request):
+        if not isinstance(request.data, Mapping):
+            return None
+        username = request.data.get('username')
+        if not isinstance(username, str):
+            return None
+        return username.lower()
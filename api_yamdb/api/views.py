@@ -1,8 +1,5 @@
-import secrets
-
-from django.conf import settings
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
@@ -10,20 +7,29 @@ from rest_framework.decorators import action
 from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 
-from api.filters import TitleFilter
+from api.authentication import get_user_instance
+from api.constants import HISTOGRAM_PARAM, LEADERBOARD_LIMIT
+from api.filters import (NameSearchFilter, TitleFilter, TitleOrderingFilter,
+                         TitleSearchFilter)
 from api.mixins import (AdminPermissionMixin, AllowAnyPermissionMixin,
-                        AuthorPermissionMixin, GenreGroupMixin,
-                        HTTPMethodsMixin)
+                        AuthorPermissionMixin, AuthThrottleMixin,
+                        ConditionalGetMixin, GenreGroupMixin, HTTPMethodsMixin,
+                        ReplicaReadMixin)
+from api.pagination import (EstimatedCountPagination, PubDatePagination,
+                            TitlePagination)
 from api.permissions import IsAdmin
 from api.serializers import (CommentSerializer, GenreSerializer,
                              GroupSerializer, ReviewSerializer,
                              TitleCreateSerializer, TitleReadSerializer,
                              TokenObtainSerializer, UserProfileSerializer,
                              UserRegistrationSerializer, UserSerializer)
-from reviews.models import Comment, Genre, Group, Review, Title
-from users.models import User
+from reviews.constants import LEADERBOARD_SIZE
+from reviews.export import EXPORT_FORMATS, EXPORT_LAYOUTS
+from reviews.models import (Comment, Genre, Group, Leaderboard,
+                            RatingHistogram, Review, Title)
+from users.models import OutboxEmail, User
+from users.tokens import access_token_for
 
 
 class GroupViewSet(GenreGroupMixin):
@@ -34,28 +40,123 @@ class GroupViewSet(GenreGroupMixin):
 
 
 class TitleViewSet(
-    AdminPermissionMixin, HTTPMethodsMixin, viewsets.ModelViewSet
+    ReplicaReadMixin, AdminPermissionMixin, HTTPMethodsMixin,
+    ConditionalGetMixin, viewsets.ModelViewSet
 ):
     """ViewSet модели Title."""
 
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')
+    queryset = Title.objects.select_related('group').prefetch_related(
+        'genre'
     ).order_by('-id')
-    filter_backends = (DjangoFilterBackend,)
+    filter_backends = (
+        DjangoFilterBackend, TitleSearchFilter, NameSearchFilter,
+        TitleOrderingFilter,
+    )
     filterset_class = TitleFilter
+    pagination_class = TitlePagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if HISTOGRAM_PARAM in self.request.query_params:
+            queryset = queryset.select_related('rating_histogram')
+        return queryset
 
     def get_serializer_class(self):
         if self.request.method in SAFE_METHODS:
             return TitleReadSerializer
         return TitleCreateSerializer
 
+    def get_title_id(self):
+        if self.action != 'retrieve':
+            return None
+        return self.kwargs.get('pk')
+
+    def get_leaderboard_limit(self):
+        try:
+            limit = int(
+                self.request.query_params.get('limit', LEADERBOARD_LIMIT)
+            )
+        except ValueError:
+            limit = LEADERBOARD_LIMIT
+        return min(max(limit, 1), LEADERBOARD_SIZE)
+
+    def leaderboard_response(self, kind, scope, key=''):
+        titles = self.get_queryset().filter(
+            leaderboards__kind=kind,
+            leaderboards__scope=scope,
+            leaderboards__key=key,
+        ).order_by('leaderboards__position')[:self.get_leaderboard_limit()]
+        return Response(self.get_serializer(titles, many=True).data)
+
+    @action(detail=False)
+    def top(self, request):
+        """
+        Лучшие произведения по рейтингу: в целом или в пределах
+        одного жанра (genre), категории (category) или года (year).
+        """
+        scopes = {
+            'genre': Leaderboard.Scope.GENRE,
+            'category': Leaderboard.Scope.CATEGORY,
+            'year': Leaderboard.Scope.YEAR,
+        }
+        selected = [param for param in scopes if param in request.query_params]
+        if len(selected) > 1:
+            return Response(
+                {'detail': 'Укажите только один из параметров: '
+                           'genre, category или year.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not selected:
+            return self.leaderboard_response(
+                Leaderboard.Kind.TOP, Leaderboard.Scope.ALL
+            )
+        return self.leaderboard_response(
+            Leaderboard.Kind.TOP,
+            scopes[selected[0]],
+            request.query_params[selected[0]],
+        )
+
+    @action(detail=False)
+    def trending(self, request):
+        """Произведения с наибольшим числом отзывов за последние дни."""
+        return self.leaderboard_response(
+            Leaderboard.Kind.TRENDING, Leaderboard.Scope.ALL
+        )
+
+    @action(detail=True, url_path='rating-histogram')
+    def rating_histogram(self, request, pk=None):
+        """Распределение оценок произведения: одна строка из базы."""
+        histogram = get_object_or_404(RatingHistogram, title_id=pk)
+        return Response(histogram.as_dict())
+
+    @action(detail=False, permission_classes=(IsAdmin,))
+    def export(self, request):
+        """
+        Потоково выгружает таблицу (по умолчанию titles.csv)
+        в формате NDJSON или CSV в раскладке import_csv.
+        """
+        name = request.query_params.get('file', 'titles.csv')
+        output = request.query_params.get('output', 'ndjson')
+        if name not in EXPORT_LAYOUTS or output not in EXPORT_FORMATS:
+            return Response(
+                {
+                    'file': list(EXPORT_LAYOUTS),
+                    'output': list(EXPORT_FORMATS),
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        export, content_type = EXPORT_FORMATS[output]
+        return StreamingHttpResponse(export(name), content_type=content_type)
+
 
 class ReviewViewSet(
-    AuthorPermissionMixin, HTTPMethodsMixin, viewsets.ModelViewSet
+    ReplicaReadMixin, AuthorPermissionMixin, HTTPMethodsMixin,
+    ConditionalGetMixin, viewsets.ModelViewSet
 ):
     """ViewSet модели Review."""
 
     serializer_class = ReviewSerializer
+    pagination_class = PubDatePagination
 
     def get_title_id(self):
         return self.kwargs.get('title_id')
@@ -63,31 +164,63 @@ class ReviewViewSet(
     def get_queryset(self):
         return Review.objects.filter(
             title_id=self.get_title_id()
-        )
+        ).select_related('author')
+
+    def get_list_count(self):
+        """Число отзывов берётся из счётчика оценок произведения."""
+        return Title.objects.filter(
+            pk=self.get_title_id()
+        ).values_list('rating_count', flat=True).first() or 0
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.get_title_id())
-        serializer.save(author=self.request.user, title=title)
+        title_id = self.get_title_id()
+        if not Title.objects.filter(pk=title_id).exists():
+            raise Http404
+        serializer.save(
+            author=get_user_instance(self.request.user), title_id=title_id
+        )
 
 
 class CommentViewSet(
-    AuthorPermissionMixin, HTTPMethodsMixin, viewsets.ModelViewSet
+    ReplicaReadMixin, AuthorPermissionMixin, HTTPMethodsMixin,
+    ConditionalGetMixin, viewsets.ModelViewSet
 ):
     """ViewSet модели Comment."""
 
     serializer_class = CommentSerializer
+    pagination_class = PubDatePagination
+
+    def get_title_id(self):
+        return self.kwargs.get('title_id')
 
     def get_review_id(self):
         return self.kwargs.get('review_id')
 
+    def get_reviews(self):
+        """Отзыв из URL, если он относится к произведению из URL."""
+        return Review.objects.filter(
+            pk=self.get_review_id(), title_id=self.get_title_id()
+        )
+
     def get_queryset(self):
         return Comment.objects.filter(
-            review_id=self.get_review_id()
-        )
+            review_id=self.get_review_id(),
+            review__title_id=self.get_title_id(),
+        ).select_related('author')
+
+    def get_list_count(self):
+        """Число комментариев берётся из счётчика отзыва."""
+        return self.get_reviews().values_list(
+            'comment_count', flat=True
+        ).first() or 0
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, id=self.get_review_id())
-        serializer.save(author=self.request.user, review=review)
+        if not self.get_reviews().exists():
+            raise Http404
+        serializer.save(
+            author=get_user_instance(self.request.user),
+            review_id=self.get_review_id()
+        )
 
 
 class GenreViewSet(GenreGroupMixin):
@@ -107,6 +240,7 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAdmin]
+    pagination_class = EstimatedCountPagination
     filter_backends = [filters.SearchFilter]
     search_fields = ['username']
     lookup_field = 'username'
@@ -118,7 +252,7 @@ class UserViewSet(viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated],
     )
     def me(self, request):
-        user = request.user
+        user = get_user_instance(request.user)
 
         if request.method == 'GET':
             serializer = UserProfileSerializer(user)
@@ -135,34 +269,38 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class SignupView(AllowAnyPermissionMixin, APIView):
+class SignupView(AllowAnyPermissionMixin, AuthThrottleMixin, APIView):
     """
     Регистрация пользователя.
-    Создаёт пользователя и отправляет код подтверждения на email.
+    Создаёт пользователя и ставит письмо с кодом подтверждения
+    в очередь; письма отправляет команда send_outbox.
     """
 
-    def post(self, request):
-        serializer = UserRegistrationSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+    throttle_scope = 'signup'
+
+    def register(self, data):
+        """
+        Проверка, запись пользователя и письма в одной транзакции:
+        один запрос на чтение и один на запись пользователя.
+        """
+        with transaction.atomic():
+            serializer = UserRegistrationSerializer(data=data)
+            serializer.is_valid(raise_exception=True)
+            user = serializer.save()
+            OutboxEmail.objects.create(
+                subject='Код подтверждения',
+                message=f'Ваш код подтверждения: {user.confirmation_code}',
+                recipient=user.email,
+            )
+        return user
 
-        user, created = User.objects.get_or_create(
-            username=serializer.validated_data['username'],
-            defaults={
-                'email': serializer.validated_data['email'],
-                'confirmation_code': secrets.token_urlsafe(32)
-            }
-        )
-        if not created:
-            user.confirmation_code = secrets.token_urlsafe(32)
-            user.save()
-
-        send_mail(
-            subject='Код подтверждения',
-            message=f'Ваш код подтверждения: {user.confirmation_code}',
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            fail_silently=False,
-        )
+    def post(self, request):
+        try:
+            user = self.register(request.data)
+        except IntegrityError:
+            # Параллельный запрос успел создать пользователя с тем же
+            # username или email: повторная проверка учтёт эту запись.
+            user = self.register(request.data)
 
         return Response(
             {'email': user.email, 'username': user.username},
@@ -170,19 +308,20 @@ class SignupView(AllowAnyPermissionMixin, APIView):
         )
 
 
-class TokenView(AllowAnyPermissionMixin, APIView):
+class TokenView(AllowAnyPermissionMixin, AuthThrottleMixin, APIView):
     """Получение JWT-токена на основе username и confirmation_code."""
 
+    throttle_scope = 'token'
+
     def post(self, request):
         serializer = TokenObtainSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         user = serializer.validated_data['user']
-        refresh = RefreshToken.for_user(user)
 
         return Response(
             {
-                'token': str(refresh.access_token),
+                'token': str(access_token_for(user)),
                 'user_id': user.id,
                 'username': user.username
             },
@@ -0,0 +1,111 @@
+import csv
+import math
+import os
+import time
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from reviews.models import Comment, Genre, Group, Review, Title, User
+
+REVIEWS = 100_000
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость import_csv в обычном и параллельном режимах '
+        'на синтетических данных. Изменения в базе откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reviews', type=int, default=REVIEWS)
+        parser.add_argument('--comments', type=int)
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--chunk-size', type=int)
+
+    def handle(self, *args, **options):
+        reviews = options['reviews']
+        comments = options['comments'] or reviews
+        parallel = {'workers': options['workers']}
+        if options['chunk_size']:
+            parallel['chunk_size'] = options['chunk_size']
+        with TemporaryDirectory() as data_dir:
+            self.write_dataset(Path(data_dir), reviews, comments)
+            for label, extra in (('обычный', {}), ('параллельный', parallel)):
+                with transaction.atomic():
+                    started = time.monotonic()
+                    call_command(
+                        'import_csv', data_dir=Path(data_dir),
+                        stdout=StringIO(), **extra
+                    )
+                    elapsed = time.monotonic() - started
+                    transaction.set_rollback(True)
+                self.stdout.write(
+                    f'{label}: {reviews + comments} отзывов и комментариев '
+                    f'за {elapsed:.2f} с '
+                    f'({(reviews + comments) / elapsed:.0f} строк/с)'
+                )
+
+    def write_dataset(self, data_dir, reviews, comments):
+        """Пишет набор CSV, не пересекающийся с данными в базе."""
+        start = {
+            model: (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+            for model in (Group, Genre, User, Title, Review, Comment,
+                          Title.genre.through)
+        }
+        side = math.ceil(math.sqrt(reviews))
+        users = range(start[User], start[User] + side)
+        titles = range(start[Title], start[Title] + side)
+        self.write_csv(data_dir / 'category.csv', ('id', 'name', 'slug'), [
+            (start[Group], 'Бенчмарк', f'bench-{start[Group]}')
+        ])
+        self.write_csv(data_dir / 'genre.csv', ('id', 'name', 'slug'), [
+            (start[Genre], 'Бенчмарк', f'bench-{start[Genre]}')
+        ])
+        self.write_csv(data_dir / 'users.csv', (
+            'id', 'username', 'email', 'role', 'bio', 'first_name',
+            'last_name'
+        ), (
+            (pk, f'bench{pk}', f'bench{pk}@yamdb.fake', 'user', '', '', '')
+            for pk in users
+        ))
+        self.write_csv(data_dir / 'titles.csv', (
+            'id', 'name', 'year', 'category'
+        ), ((pk, f'Произведение {pk}', 2000, start[Group]) for pk in titles))
+        self.write_csv(data_dir / 'genre_title.csv', (
+            'id', 'title_id', 'genre_id'
+        ), (
+            (start[Title.genre.through] + idx, pk, start[Genre])
+            for idx, pk in enumerate(titles)
+        ))
+        self.write_csv(data_dir / 'review.csv', (
+            'id', 'title_id', 'text', 'author', 'score', 'pub_date'
+        ), (
+            (
+                start[Review] + idx, titles[idx // side],
+                f'Отзыв номер {idx}\nв две строки', users[idx % side],
+                idx % 10 + 1, '2020-01-01T00:00:00Z'
+            )
+            for idx in range(reviews)
+        ))
+        self.write_csv(data_dir / 'comments.csv', (
+            'id', 'review_id', 'text', 'author', 'pub_date'
+        ), (
+            (
+                start[Comment] + idx, start[Review] + idx % reviews,
+                f'Комментарий номер {idx}', users[idx % side],
+                '2020-01-01T00:00:00Z'
+            )
+            for idx in range(comments)
+        ))
+
+    def write_csv(self, path, header, rows):
+        with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(header)
+            writer.writerows(rows)
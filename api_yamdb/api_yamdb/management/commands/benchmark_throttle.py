@@ -0,0 +1,68 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.constants import THROTTLE_BUDGET_US
+from api.views import SignupView
+
+REQUESTS = 10_000
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет накладные расходы ограничения частоты на один запрос '
+        'к /auth/signup/ и сравнивает их с бюджетом.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=REQUESTS)
+        parser.add_argument(
+            '--budget-us',
+            type=float,
+            default=THROTTLE_BUDGET_US,
+            help='Допустимое среднее время проверки в микросекундах.',
+        )
+
+    def handle(self, *args, **options):
+        view = SignupView()
+        throttles = view.get_throttles()
+        requests = self.build_requests(options['requests'])
+        timings = []
+        for request in requests:
+            started = time.perf_counter()
+            for throttle in throttles:
+                throttle.allow_request(request, view)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+        timings.sort()
+        mean = sum(timings) / len(timings)
+        p99 = timings[int(len(timings) * 0.99) - 1]
+        self.stdout.write(
+            f'{len(timings)} запросов: в среднем {mean:.1f} мкс, '
+            f'p99 {p99:.1f} мкс, бюджет {options["budget_us"]:.0f} мкс'
+        )
+        if mean > options['budget_us']:
+            raise CommandError('Накладные расходы превышают бюджет.')
+
+    def build_requests(self, count):
+        """
+        Запросы с разными адресами из документационной сети
+        и разными username, тело разбирается заранее.
+        """
+        factory = APIRequestFactory()
+        requests = []
+        for idx in range(count):
+            request = Request(
+                factory.post(
+                    '/api/v1/auth/signup/',
+                    {'username': f'benchmark-{idx}'},
+                    format='json',
+                    REMOTE_ADDR=f'198.51.100.{idx % 256}',
+                ),
+                parsers=[JSONParser()],
+            )
+            request.data
+            requests.append(request)
+        return requests
@@ -0,0 +1,55 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from reviews.export import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, EXPORT_LAYOUTS
+
+
+class Command(BaseCommand):
+    help = 'Выгружает данные в CSV или NDJSON в раскладке import_csv.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir',
+            type=Path,
+            default=Path('.'),
+            help='Каталог для выгружаемых файлов.',
+        )
+        parser.add_argument(
+            '--files',
+            nargs='+',
+            choices=list(EXPORT_LAYOUTS),
+            help='Выгрузить только указанные файлы.',
+        )
+        parser.add_argument(
+            '--format',
+            choices=list(EXPORT_FORMATS),
+            default='csv',
+            dest='export_format',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help='Количество строк, читаемых из базы за раз.',
+        )
+
+    def handle(self, *args, **options):
+        output_dir = options['output_dir']
+        output_dir.mkdir(parents=True, exist_ok=True)
+        export, _ = EXPORT_FORMATS[options['export_format']]
+        for name in options['files'] or EXPORT_LAYOUTS:
+            path = output_dir / name
+            if options['export_format'] != 'csv':
+                path = path.with_suffix(f'.{options["export_format"]}')
+            started = time.monotonic()
+            count = 0
+            with open(path, 'w', newline='', encoding='utf-8') as output:
+                for line in export(name, options['chunk_size']):
+                    output.write(line)
+                    count += 1
+            self.stdout.write(
+                f'{path}: {count} строк за '
+                f'{time.monotonic() - started:.2f} с'
+            )
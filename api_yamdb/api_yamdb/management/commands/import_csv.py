@@ -1,102 +1,368 @@
 import csv
+import io
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
 
-from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
-from reviews.models import (Comment, Genre, Group, Review, Title,
-                            User)
+from reviews.constants import MAX_SCORE, MIN_SCORE
+from reviews.models import (Comment, Genre, Group, RatingHistogram, Review,
+                            Title, User)
+from users.tokens import revoke_tokens
 
+BATCH_SIZE = 1000
+CHUNK_SIZE = 5000
+# Не больше параметров в одном запросе, чем допускает SQLite.
+TOUCH_CHUNK_SIZE = 900
+DATA_DIR = settings.BASE_DIR / 'static' / 'data'
 
-class Command(BaseCommand):
+# Файл, модель, метод сборки объекта из строки, сравниваемые при upsert поля.
+IMPORT_FILES = (
+    ('category.csv', Group, 'build_group', ('name', 'slug')),
+    ('genre.csv', Genre, 'build_genre', ('name', 'slug')),
+    ('users.csv', User, 'build_user', (
+        'username', 'email', 'role', 'bio', 'first_name', 'last_name'
+    )),
+    ('titles.csv', Title, 'build_title', (
+        'name', 'year', 'group_id', 'description'
+    )),
+    ('genre_title.csv', Title.genre.through, 'build_genre_title', (
+        'title_id', 'genre_id'
+    )),
+    ('review.csv', Review, 'build_review', (
+        'title_id', 'text', 'author_id', 'score', 'pub_date'
+    )),
+    ('comments.csv', Comment, 'build_comment', (
+        'review_id', 'text', 'author_id', 'pub_date'
+    )),
+)
+
+
+def clean_review_row(row):
+    """Проверяет и приводит типы строки review.csv."""
+    score = int(row['score'])
+    if not MIN_SCORE <= score <= MAX_SCORE:
+        raise ValueError(f'отзыв id={row["id"]}: недопустимая оценка {score}')
+    return {
+        **row,
+        'id': int(row['id']),
+        'title_id': int(row['title_id']),
+        'author': int(row['author']),
+        'score': score,
+    }
+
+
+def clean_comment_row(row):
+    """Проверяет и приводит типы строки comments.csv."""
+    return {
+        **row,
+        'id': int(row['id']),
+        'review_id': int(row['review_id']),
+        'author': int(row['author']),
+    }
 
-    def handle(self, *args, **options):
 
-        with open(
-            'static/data/category.csv',
-            newline='',
-            encoding='utf-8'
-        ) as csvfile:
+def split_records(csvfile, chunk_size):
+    """
+    Делит CSV-файл на пачки по chunk_size целых записей, не разбирая их.
+    Перевод строки завершает запись, только если число кавычек
+    до него чётно: иначе он внутри значения в кавычках.
+    """
+    chunk, records, quotes = [], 0, 0
+    for line in csvfile:
+        chunk.append(line)
+        quotes += line.count(b'"')
+        if quotes % 2 == 0:
+            records += 1
+            if records >= chunk_size:
+                yield b''.join(chunk)
+                chunk, records = [], 0
+    if chunk:
+        yield b''.join(chunk)
 
-            reader = csv.DictReader(csvfile)
 
-            for row in reader:
-                Group.objects.create(**row)
+def clean_chunk(clean_row, fieldnames, data):
+    """Разбирает и проверяет пачку записей в процессе-воркере."""
+    rows = csv.DictReader(
+        io.StringIO(data.decode('utf-8'), newline=''), fieldnames=fieldnames
+    )
+    return [clean_row(row) for row in rows]
 
-        with open(
-            'static/data/genre.csv',
-            newline='',
-            encoding='utf-8'
-        ) as csvfile:
 
-            reader = csv.DictReader(csvfile)
+# Проверка и приведение типов строк крупных файлов; их можно
+# разбирать в пуле процессов.
+ROW_CLEANERS = {
+    'review.csv': clean_review_row,
+    'comments.csv': clean_comment_row,
+}
 
-            for row in reader:
-                Genre.objects.create(**row)
 
-        with open(
-            'static/data/users.csv',
-            newline='',
-            encoding='utf-8'
-        ) as csvfile:
+class Command(BaseCommand):
+    help = 'Загружает данные из CSV-файлов в базу данных.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir',
+            type=Path,
+            default=DATA_DIR,
+            help='Каталог с CSV-файлами.',
+        )
+        parser.add_argument(
+            '--files',
+            nargs='+',
+            choices=[filename for filename, *_ in IMPORT_FILES],
+            help='Загрузить только указанные файлы.',
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help=(
+                'Добавлять новые строки, обновлять изменённые '
+                'и пропускать совпадающие.'
+            ),
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество строк в одном INSERT.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help=(
+                'Количество процессов для разбора review.csv и comments.csv; '
+                'при 1 файлы разбираются в основном процессе.'
+            ),
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Количество строк, передаваемых воркеру за раз.',
+        )
+
+    def handle(self, *args, **options):
+        self.data_dir = options['data_dir']
+        self.batch_size = options['batch_size']
+        self.upsert = options['upsert']
+        self.workers = options['workers']
+        self.chunk_size = options['chunk_size']
+        self.id_maps = {}
+        self.title_ids = set()
+        self.review_ids = set()
+        selected = options['files']
+        with transaction.atomic():
+            for filename, model, build, fields in IMPORT_FILES:
+                if selected and filename not in selected:
+                    continue
+                self.import_file(
+                    filename, model, getattr(self, build), fields
+                )
+            # bulk_create не вызывает save(), рейтинг и счётчики считаем разом.
+            Title.objects.recompute_ratings()
+            Review.objects.recompute_comment_counts()
+            RatingHistogram.objects.rebuild()
+            self.touch_titles()
+
+    def import_file(self, filename, model, build, fields):
+        path = self.data_dir / filename
+        if not path.is_file():
+            raise CommandError(f'Файл {path} не найден.')
+        started = time.monotonic()
+        counts = {'created': 0, 'updated': 0, 'skipped': 0}
+        rows = self.read_rows(path, ROW_CLEANERS.get(filename))
+        while True:
+            try:
+                batch = [build(row) for row in islice(
+                    rows, self.batch_size
+                )]
+            except ValueError as error:
+                raise CommandError(f'{filename}: {error}')
+            if not batch:
+                break
+            if self.upsert:
+                self.upsert_batch(model, batch, fields, counts)
+            else:
+                self.create_batch(model, batch)
+                self.track_titles(model, batch)
+                counts['created'] += len(batch)
+        self.id_maps.pop(model, None)
+        elapsed = time.monotonic() - started
+        total = sum(counts.values())
+        self.stdout.write(
+            f'{filename}: {total} строк за {elapsed:.2f} с '
+            f'({total / elapsed if elapsed else total:.0f} строк/с), '
+            f'добавлено {counts["created"]}, обновлено {counts["updated"]}, '
+            f'пропущено {counts["skipped"]}'
+        )
 
-            reader = csv.DictReader(csvfile)
+    def read_rows(self, path, clean_row=None):
+        """Итерирует строки файла, проверенные clean_row, если он задан."""
+        if clean_row and self.workers > 1:
+            yield from self.clean_in_pool(path, clean_row)
+            return
+        with open(path, newline='', encoding='utf-8') as csvfile:
+            rows = csv.DictReader(csvfile)
+            yield from map(clean_row, rows) if clean_row else rows
 
-            for row in reader:
-                User.objects.create(**row)
+    def clean_in_pool(self, path, clean_row):
+        """
+        Раздаёт пулу процессов пачки сырых записей для разбора
+        и проверки и отдаёт результат по порядку. Основной процесс
+        только делит файл по границам записей, число пачек в работе
+        ограничено, поэтому память не растёт с размером файла.
+        """
+        with open(path, 'rb') as csvfile:
+            fieldnames = next(csv.reader([csvfile.readline().decode('utf-8')]))
+            chunks = split_records(csvfile, self.chunk_size)
+            with ProcessPoolExecutor(self.workers) as executor:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(executor.submit(
+                        clean_chunk, clean_row, fieldnames, chunk
+                    ))
+                    if len(pending) >= self.workers * 2:
+                        yield from pending.popleft().result()
+                while pending:
+                    yield from pending.popleft().result()
 
-        with open(
-            'static/data/titles.csv',
-            newline='',
-            encoding='utf-8'
-        ) as csvfile:
+    def create_batch(self, model, objs):
+        """
+        Добавляет объекты пачки. bulk_create вызывает pre_save полей,
+        и auto_now_add заменяет даты из файла текущим временем,
+        поэтому они восстанавливаются вторым запросом.
+        """
+        dated = [
+            field.attname for field in model._meta.concrete_fields
+            if getattr(field, 'auto_now_add', False)
+            and all(getattr(obj, field.attname) for obj in objs)
+        ]
+        values = [[getattr(obj, name) for name in dated] for obj in objs]
+        model.objects.bulk_create(objs, batch_size=self.batch_size)
+        if dated and objs:
+            for obj, row in zip(objs, values):
+                for name, value in zip(dated, row):
+                    setattr(obj, name, value)
+            model.objects.bulk_update(
+                objs, dated, batch_size=self.batch_size
+            )
 
-            reader = csv.DictReader(csvfile)
+    def upsert_batch(self, model, batch, fields, counts):
+        """Добавляет новые и обновляет изменённые объекты пачки."""
+        meta_fields = [model._meta.get_field(name) for name in fields]
+        existing = model.objects.in_bulk(
+            [model._meta.pk.to_python(obj.pk) for obj in batch]
+        )
+        created, updated = [], []
+        for obj in batch:
+            current = existing.get(model._meta.pk.to_python(obj.pk))
+            if current is None:
+                created.append(obj)
+            elif any(
+                field.to_python(getattr(obj, field.attname))
+                != getattr(current, field.attname)
+                for field in meta_fields
+            ):
+                updated.append(obj)
+        self.create_batch(model, created)
+        if updated:
+            model.objects.bulk_update(
+                updated, fields, batch_size=self.batch_size
+            )
+            if model is User:
+                self.revoke_changed_tokens(updated, existing, fields)
+        self.track_titles(model, created + updated)
+        counts['created'] += len(created)
+        counts['updated'] += len(updated)
+        counts['skipped'] += len(batch) - len(created) - len(updated)
 
-            for row in reader:
-                group_id = row.pop('category')
-                group = Group.objects.get(id=group_id)
-                row['group'] = group
-                Title.objects.create(**row)
+    def revoke_changed_tokens(self, users, existing, fields):
+        """
+        Отзывает токены пользователей, у которых изменились данные
+        из токена: bulk_update не вызывает User.save().
+        """
+        for user in users:
+            current = existing[User._meta.pk.to_python(user.pk)]
+            claims = current.token_claims()
+            for name in fields:
+                setattr(current, name, getattr(user, name))
+            if current.token_claims() != claims:
+                revoke_tokens(current.pk)
 
-        with open(
-            'static/data/genre_title.csv',
-            newline='',
-            encoding='utf-8'
-        ) as csvfile:
+    def track_titles(self, model, objs):
+        """Запоминает произведения, которых касаются записанные строки."""
+        if model is Comment:
+            self.review_ids.update(obj.review_id for obj in objs)
+        elif model is Title:
+            self.title_ids.update(
+                Title._meta.pk.to_python(obj.pk) for obj in objs
+            )
+        elif model in (Title.genre.through, Review):
+            self.title_ids.update(obj.title_id for obj in objs)
 
-            reader = csv.DictReader(csvfile)
+    def touch_titles(self):
+        """
+        Отмечает изменение затронутых произведений, чтобы клиенты
+        не получали 304 с устаревшими рейтингом и отзывами.
+        """
+        review_ids = sorted(self.review_ids)
+        for start in range(0, len(review_ids), TOUCH_CHUNK_SIZE):
+            self.title_ids.update(Review.objects.filter(
+                pk__in=review_ids[start:start + TOUCH_CHUNK_SIZE]
+            ).values_list('title_id', flat=True))
+        title_ids = sorted(self.title_ids)
+        for start in range(0, len(title_ids), TOUCH_CHUNK_SIZE):
+            Title.objects.filter(
+                pk__in=title_ids[start:start + TOUCH_CHUNK_SIZE]
+            ).touch()
 
-            for row in reader:
+    def resolve(self, model, value):
+        """Находит id связанной записи по заранее загруженной карте."""
+        if model not in self.id_maps:
+            self.id_maps[model] = {
+                str(pk): pk
+                for pk in model.objects.values_list('pk', flat=True)
+            }
+        try:
+            return self.id_maps[model][str(value)]
+        except KeyError:
+            raise CommandError(
+                f'{model._meta.verbose_name} с id={value} не найден(а).'
+            )
 
-                title_id = row.pop('title_id')
-                genre_id = row.pop('genre_id')
+    def build_group(self, row):
+        return Group(**row)
 
-                title = Title.objects.get(id=title_id)
-                genre = Genre.objects.get(id=genre_id)
+    def build_genre(self, row):
+        return Genre(**row)
 
-                title.genre.add(genre)
+    def build_user(self, row):
+        return User(**row)
 
-        with open(
-            'static/data/review.csv',
-            newline='',
-            encoding='utf-8'
-        ) as csvfile:
-            reader = csv.DictReader(csvfile)
+    def build_title(self, row):
+        group_id = self.resolve(Group, row.pop('category'))
+        return Title(group_id=group_id, **row)
 
-            for row in reader:
-                user_id = row.pop('author')
-                user = User.objects.get(id=user_id)
-                row['author'] = user
-                Review.objects.create(**row)
+    def build_genre_title(self, row):
+        return Title.genre.through(
+            id=row['id'],
+            title_id=self.resolve(Title, row['title_id']),
+            genre_id=self.resolve(Genre, row['genre_id']),
+        )
 
-        with open(
-            'static/data/comments.csv',
-            newline='',
-            encoding='utf-8'
-        ) as csvfile:
-            reader = csv.DictReader(csvfile)
+    def build_review(self, row):
+        author_id = self.resolve(User, row.pop('author'))
+        row['title_id'] = self.resolve(Title, row['title_id'])
+        return Review(author_id=author_id, **row)
 
-            for row in reader:
-                user_id = row.pop('author')
-                user = User.objects.get(id=user_id)
-                row['author'] = user
-                Comment.objects.create(**row)
+    def build_comment(self, row):
+        author_id = self.resolve(User, row.pop('author'))
+        row['review_id'] = self.resolve(Review, row['review_id'])
+        return Comment(author_id=author_id, **row)
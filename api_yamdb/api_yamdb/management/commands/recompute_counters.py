@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import RatingHistogram, Review, Title
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает хранимые счётчики: рейтинг и число отзывов '
+        'произведений, распределение оценок, число комментариев к отзывам.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            titles = Title.objects.recompute_ratings()
+            reviews = Review.objects.recompute_comment_counts()
+            RatingHistogram.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Счётчики пересчитаны для {titles} произведений '
+            f'и {reviews} отзывов.'
+        ))
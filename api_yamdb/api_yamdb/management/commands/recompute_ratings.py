@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает хранимый рейтинг произведений по отзывам.'
+
+    def handle(self, *args, **options):
+        updated = Title.objects.recompute_ratings()
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг пересчитан для {updated} произведений.'
+        ))
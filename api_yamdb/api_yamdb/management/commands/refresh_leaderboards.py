@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from reviews.constants import LEADERBOARD_SIZE, TRENDING_DAYS
+from reviews.models import Leaderboard
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает таблицы лучших и обсуждаемых произведений. '
+        'Запускается периодически, например из cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size',
+            type=int,
+            default=LEADERBOARD_SIZE,
+            help='Количество мест в каждой таблице.',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=TRENDING_DAYS,
+            help='Окно в днях для обсуждаемых произведений.',
+        )
+
+    def handle(self, *args, **options):
+        count = Leaderboard.objects.refresh(
+            size=options['size'], trending_days=options['days']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинги пересчитаны, записей: {count}.'
+        ))
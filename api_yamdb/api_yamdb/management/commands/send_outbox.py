@@ -0,0 +1,155 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from users.constants import (OUTBOX_BATCH_SIZE, OUTBOX_MAX_ATTEMPTS,
+                             OUTBOX_POLL_INTERVAL, OUTBOX_WORKERS)
+from users.models import OutboxEmail
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди пачками в пуле потоков '
+        'с повторными попытками и выводит метрики очереди.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=OUTBOX_BATCH_SIZE,
+            help='Количество писем, забираемых из очереди за раз.',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=OUTBOX_WORKERS,
+            help='Количество потоков отправки.',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=OUTBOX_MAX_ATTEMPTS,
+            help='После стольких неудач письмо больше не отправляется.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Не завершаться, а ждать новых писем.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=OUTBOX_POLL_INTERVAL,
+            help='Пауза в секундах между опросами пустой очереди.',
+        )
+
+    def handle(self, *args, **options):
+        self.max_attempts = options['max_attempts']
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+        totals = {'sent': 0, 'failed': 0}
+        with ThreadPoolExecutor(options['workers']) as executor:
+            try:
+                while True:
+                    sent, failed = self.process_batch(
+                        executor, options['batch_size']
+                    )
+                    totals['sent'] += sent
+                    totals['failed'] += failed
+                    if sent or failed:
+                        continue
+                    if not options['loop']:
+                        break
+                    time.sleep(options['interval'])
+            finally:
+                for mail_connection in self.connections:
+                    mail_connection.close()
+        self.stdout.write(
+            f'Итого отправлено {totals["sent"]}, ошибок {totals["failed"]}; '
+            f'{self.queue_metrics()}'
+        )
+
+    def process_batch(self, executor, batch_size):
+        """
+        Забирает пачку писем в короткой транзакции, отправляет её
+        в пуле потоков вне транзакции и во второй короткой транзакции
+        записывает результат.
+        """
+        with transaction.atomic():
+            emails = OutboxEmail.objects.due(self.max_attempts)
+            if connection.features.has_select_for_update_skip_locked:
+                emails = emails.select_for_update(skip_locked=True)
+            emails = emails.claim(batch_size)
+        if not emails:
+            return 0, 0
+        results = list(executor.map(self.send, emails))
+        now = timezone.now()
+        sent = [email for email, error in results if error is None]
+        failed = []
+        for email, error in results:
+            if error is not None:
+                email.fail(error)
+                failed.append(email)
+        with transaction.atomic():
+            OutboxEmail.objects.filter(
+                pk__in=[email.pk for email in sent]
+            ).update(sent_at=now, claimed_until=None)
+            OutboxEmail.objects.bulk_update(failed, (
+                'attempts', 'last_error', 'next_attempt_at', 'claimed_until'
+            ))
+        latencies = [
+            (now - email.created_at).total_seconds() for email in sent
+        ]
+        self.stdout.write(
+            f'Отправлено {len(sent)}, ошибок {len(failed)}'
+            + (
+                f', задержка в среднем {sum(latencies) / len(latencies):.2f} '
+                f'с, максимум {max(latencies):.2f} с' if latencies else ''
+            )
+            + f'; {self.queue_metrics()}'
+        )
+        return len(sent), len(failed)
+
+    def queue_metrics(self):
+        pending = OutboxEmail.objects.pending(self.max_attempts)
+        stats = pending.aggregate(oldest=Min('created_at'))
+        depth = pending.count()
+        if not depth:
+            return 'очередь пуста'
+        age = (timezone.now() - stats['oldest']).total_seconds()
+        return f'в очереди {depth}, самое старое ждёт {age:.0f} с'
+
+    def get_mail_connection(self):
+        """Почтовое соединение потока: открывается один раз на поток."""
+        if not hasattr(self.local, 'connection'):
+            mail_connection = get_connection(fail_silently=False)
+            mail_connection.open()
+            self.local.connection = mail_connection
+            with self.lock:
+                self.connections.append(mail_connection)
+        return self.local.connection
+
+    def send(self, email):
+        try:
+            EmailMessage(
+                subject=email.subject,
+                body=email.message,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[email.recipient],
+                connection=self.get_mail_connection(),
+            ).send()
+        except Exception as error:
+            # Любая ошибка бэкенда — повод повторить отправку позже;
+            # соединение могло оборваться, поэтому открываем новое.
+            self.local.__dict__.pop('connection', None)
+            return email, error
+        return email, None
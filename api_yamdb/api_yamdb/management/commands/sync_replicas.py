@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в реплики из REPLICA_DATABASES. '
+        'Нужна для локальной проверки чтения из реплик.'
+    )
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError(
+                'Копирование доступно только для SQLite, реплики других '
+                'СУБД настраиваются средствами самой СУБД.'
+            )
+        primary.ensure_connection()
+        for alias in settings.REPLICA_DATABASES:
+            replica = connections[alias]
+            replica.ensure_connection()
+            primary.connection.backup(replica.connection)
+            self.stdout.write(f'{alias}: скопирована основная база.')
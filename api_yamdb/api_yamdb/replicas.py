@@ -0,0 +1,92 @@
+"""
+Чтение из реплик для безопасных запросов к API.
+
+ReplicaMiddleware для GET/HEAD/OPTIONS-запросов к представлениям
+с атрибутом replica_reads выбирает одну из реплик REPLICA_DATABASES,
+ReplicaRouter отправляет в неё все чтения этого запроса.
+После успешного изменяющего запроса клиент на REPLICA_PIN_SECONDS
+закрепляется за основной базой, чтобы сразу видеть свои изменения
+несмотря на задержку репликации. Клиент определяется по заголовку
+Authorization, а без него — по IP-адресу. Закрепление хранится в кеше
+REPLICA_PIN_CACHE и видно другим процессам, только если кеш общий.
+Данные, которые кладутся в общий кеш, читаются из основной базы
+(primary_reads): иначе отстающая реплика закеширует устаревший ответ
+уже после инвалидации.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+read_alias = ContextVar('read_alias', default=None)
+
+
+@contextmanager
+def primary_reads():
+    """Направляет чтения внутри блока в основную базу."""
+    token = read_alias.set(None)
+    try:
+        yield
+    finally:
+        read_alias.reset(token)
+
+
+def pin_cache():
+    return caches[settings.REPLICA_PIN_CACHE]
+
+
+def pin_key(request):
+    client = request.META.get('HTTP_AUTHORIZATION') or request.META.get(
+        'REMOTE_ADDR', ''
+    )
+    return f'db-pin:{md5(client.encode()).hexdigest()}'
+
+
+class ReplicaRouter:
+    """Чтения — в выбранную для запроса реплику, остальное — в основную."""
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.REPLICA_DATABASES
+
+
+class ReplicaMiddleware:
+    """Выбирает базу для чтения и закрепляет писавших клиентов."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = read_alias.set(None)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_alias.reset(token)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_cache().set(
+                pin_key(request), True, settings.REPLICA_PIN_SECONDS
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'cls', None)
+        if (
+            settings.REPLICA_DATABASES
+            and request.method in SAFE_METHODS
+            and getattr(view_class, 'replica_reads', False)
+            and not pin_cache().get(pin_key(request))
+        ):
+            read_alias.set(random.choice(settings.REPLICA_DATABASES))
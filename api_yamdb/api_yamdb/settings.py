@@ -32,6 +32,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api_yamdb.replicas.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -59,6 +60,30 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+    },
+    # Реплика для локальной проверки чтения из реплик: второй файл SQLite,
+    # данные в который копирует команда sync_replicas.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+    },
+}
+
+# Реплики только для чтения; чтобы включить чтение из них,
+# перечислите здесь их алиасы из DATABASES, например ['replica'].
+REPLICA_DATABASES = []
+# Сколько секунд после записи клиент читает из основной базы.
+REPLICA_PIN_SECONDS = 5
+# Кеш, в котором хранится закрепление клиента за основной базой.
+# LocMemCache действует в пределах одного процесса: при нескольких
+# процессах-воркерах укажите общий кеш (Memcached, Redis), иначе запрос,
+# попавший в другой процесс, может прочитать реплику до репликации.
+REPLICA_PIN_CACHE = 'default'
+DATABASE_ROUTERS = ['api_yamdb.replicas.ReplicaRouter']
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
@@ -97,7 +122,7 @@ DEFAULT_FROM_EMAIL = 'webmaster@example.com'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.RoleTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -106,5 +131,11 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_ip': '10/min',
+        'signup_username': '3/min',
+        'token_ip': '20/min',
+        'token_username': '5/min',
+    },
 }
 AUTH_USER_MODEL = 'users.User'
@@ -3,3 +3,14 @@ LIMIT_TEXT: int = 25
 
 MAX_SCORE: int = 10
 MIN_SCORE: int = 1
+
+SEARCH_TABLE: str = 'reviews_title_search'
+SEARCH_INDEX: str = 'reviews_title_search_idx'
+SEARCH_CONFIG: str = 'russian'
+MIN_TRIGRAM_LENGTH: int = 3
+
+GENRE_TITLE_INDEX: str = 'reviews_title_genre_genre_title_idx'
+
+LEADERBOARD_SIZE: int = 100
+TRENDING_DAYS: int = 7
+MAX_LENGTH_SLUG: int = 50
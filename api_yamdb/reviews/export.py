@@ -0,0 +1,84 @@
+import csv
+import json
+from datetime import datetime
+
+from reviews.models import Comment, Genre, Group, Review, Title, User
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Раскладка колонок совпадает с CSV-файлами, которые читает import_csv:
+# имя файла -> (модель, [(колонка, поле модели), ...]).
+EXPORT_LAYOUTS = {
+    'category.csv': (Group, (
+        ('id', 'id'), ('name', 'name'), ('slug', 'slug'),
+    )),
+    'genre.csv': (Genre, (
+        ('id', 'id'), ('name', 'name'), ('slug', 'slug'),
+    )),
+    'users.csv': (User, (
+        ('id', 'id'), ('username', 'username'), ('email', 'email'),
+        ('role', 'role'), ('bio', 'bio'), ('first_name', 'first_name'),
+        ('last_name', 'last_name'),
+    )),
+    'titles.csv': (Title, (
+        ('id', 'id'), ('name', 'name'), ('year', 'year'),
+        ('category', 'group_id'), ('description', 'description'),
+    )),
+    'genre_title.csv': (Title.genre.through, (
+        ('id', 'id'), ('title_id', 'title_id'), ('genre_id', 'genre_id'),
+    )),
+    'review.csv': (Review, (
+        ('id', 'id'), ('title_id', 'title_id'), ('text', 'text'),
+        ('author', 'author_id'), ('score', 'score'),
+        ('pub_date', 'pub_date'),
+    )),
+    'comments.csv': (Comment, (
+        ('id', 'id'), ('review_id', 'review_id'), ('text', 'text'),
+        ('author', 'author_id'), ('pub_date', 'pub_date'),
+    )),
+}
+
+
+class Echo:
+    """Файлоподобный объект, возвращающий записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(name, chunk_size=EXPORT_CHUNK_SIZE):
+    """Итерирует строки таблицы частями, не загружая её целиком."""
+    model, columns = EXPORT_LAYOUTS[name]
+    rows = model.objects.order_by('pk').values_list(
+        *(field for _, field in columns)
+    ).iterator(chunk_size=chunk_size)
+    for row in rows:
+        yield tuple(
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in row
+        )
+
+
+def iter_csv(name, chunk_size=EXPORT_CHUNK_SIZE):
+    """Отдаёт таблицу построчно в формате CSV с заголовком."""
+    _, columns = EXPORT_LAYOUTS[name]
+    writer = csv.writer(Echo())
+    yield writer.writerow([column for column, _ in columns])
+    for row in export_rows(name, chunk_size):
+        yield writer.writerow(row)
+
+
+def iter_ndjson(name, chunk_size=EXPORT_CHUNK_SIZE):
+    """Отдаёт таблицу построчно в формате NDJSON."""
+    _, columns = EXPORT_LAYOUTS[name]
+    header = [column for column, _ in columns]
+    for row in export_rows(name, chunk_size):
+        yield json.dumps(
+            dict(zip(header, row)), ensure_ascii=False, default=str
+        ) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (iter_csv, 'text/csv'),
+    'ndjson': (iter_ndjson, 'application/x-ndjson'),
+}
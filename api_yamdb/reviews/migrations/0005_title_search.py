@@ -0,0 +1,75 @@
+from django.db import migrations
+
+# SQL зафиксирован в миграции, чтобы изменения reviews.search
+# не меняли уже применённую схему.
+SEARCH_TABLE = 'reviews_title_search'
+SEARCH_INDEX = 'reviews_title_search_idx'
+SEARCH_CONFIG = 'russian'
+
+SQLITE_SEARCH_SQL = (
+    f'CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5('
+    "name, description, content='reviews_title', content_rowid='id', "
+    "tokenize='unicode61')",
+    f'CREATE TRIGGER {SEARCH_TABLE}_ai AFTER INSERT ON reviews_title BEGIN '
+    f'INSERT INTO {SEARCH_TABLE}(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    f'CREATE TRIGGER {SEARCH_TABLE}_ad AFTER DELETE ON reviews_title BEGIN '
+    f'INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); END",
+    f'CREATE TRIGGER {SEARCH_TABLE}_au AFTER UPDATE OF name, description '
+    f'ON reviews_title BEGIN '
+    f'INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, description) '
+    "VALUES ('delete', old.id, old.name, old.description); "
+    f'INSERT INTO {SEARCH_TABLE}(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')",
+)
+SQLITE_DROP_SEARCH_SQL = (
+    f'DROP TRIGGER IF EXISTS {SEARCH_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {SEARCH_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {SEARCH_TABLE}_au',
+    f'DROP TABLE IF EXISTS {SEARCH_TABLE}',
+)
+
+
+def postgres_search_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    return GinIndex(
+        SearchVector('name', 'description', config=SEARCH_CONFIG),
+        name=SEARCH_INDEX,
+    )
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.add_index(
+            apps.get_model('reviews', 'Title'), postgres_search_index()
+        )
+    elif vendor == 'sqlite':
+        for sql in SQLITE_SEARCH_SQL:
+            schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.remove_index(
+            apps.get_model('reviews', 'Title'), postgres_search_index()
+        )
+    elif vendor == 'sqlite':
+        for sql in SQLITE_DROP_SEARCH_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_title_modified'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,71 @@
+from django.db import migrations
+
+# SQL зафиксирован в миграции, чтобы изменения reviews.search
+# не меняли уже применённую схему. Шаблоны заполняются именем таблицы.
+NAME_SEARCH_TABLES = ('reviews_title', 'reviews_genre', 'reviews_group')
+
+SQLITE_NAME_INDEX_SQL = (
+    'CREATE VIRTUAL TABLE {table}_name_trigram USING fts5(name, '
+    "content='{table}', content_rowid='id', tokenize='trigram')",
+    'CREATE TRIGGER {table}_name_trigram_ai AFTER INSERT ON {table} '
+    'BEGIN INSERT INTO {table}_name_trigram(rowid, name) '
+    'VALUES (new.id, new.name); END',
+    'CREATE TRIGGER {table}_name_trigram_ad AFTER DELETE ON {table} '
+    'BEGIN INSERT INTO {table}_name_trigram({table}_name_trigram, '
+    "rowid, name) VALUES ('delete', old.id, old.name); END",
+    'CREATE TRIGGER {table}_name_trigram_au AFTER UPDATE OF name '
+    'ON {table} BEGIN INSERT INTO {table}_name_trigram('
+    "{table}_name_trigram, rowid, name) VALUES ('delete', old.id, "
+    'old.name); INSERT INTO {table}_name_trigram(rowid, name) '
+    'VALUES (new.id, new.name); END',
+    'INSERT INTO {table}_name_trigram({table}_name_trigram) '
+    "VALUES ('rebuild')",
+)
+SQLITE_DROP_NAME_INDEX_SQL = (
+    'DROP TRIGGER IF EXISTS {table}_name_trigram_ai',
+    'DROP TRIGGER IF EXISTS {table}_name_trigram_ad',
+    'DROP TRIGGER IF EXISTS {table}_name_trigram_au',
+    'DROP TABLE IF EXISTS {table}_name_trigram',
+)
+# Индекс под lookup icontains: UPPER(name::text) LIKE UPPER(%s).
+POSTGRES_NAME_INDEX_SQL = (
+    'CREATE INDEX {table}_name_trigram ON {table} '
+    'USING gin (UPPER(name::text) gin_trgm_ops)',
+)
+POSTGRES_DROP_NAME_INDEX_SQL = (
+    'DROP INDEX IF EXISTS {table}_name_trigram',
+)
+
+
+def run_sql(schema_editor, templates):
+    for table in NAME_SEARCH_TABLES:
+        for template in templates:
+            schema_editor.execute(template.format(table=table))
+
+
+def create_name_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        run_sql(schema_editor, POSTGRES_NAME_INDEX_SQL)
+    elif vendor == 'sqlite':
+        run_sql(schema_editor, SQLITE_NAME_INDEX_SQL)
+
+
+def drop_name_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        run_sql(schema_editor, POSTGRES_DROP_NAME_INDEX_SQL)
+    elif vendor == 'sqlite':
+        run_sql(schema_editor, SQLITE_DROP_NAME_INDEX_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_name_indexes, drop_name_indexes),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.2 on 2026-10-18 06:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_name_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Leaderboard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('top', 'Лучшие'), ('trending', 'Обсуждаемые')], max_length=50, verbose_name='Вид')),
+                ('scope', models.CharField(choices=[('all', 'Все произведения'), ('genre', 'Жанр'), ('category', 'Категория'), ('year', 'Год')], max_length=50, verbose_name='Область')),
+                ('key', models.CharField(blank=True, max_length=50, verbose_name='Жанр, категория или год')),
+                ('position', models.PositiveIntegerField(verbose_name='Место')),
+                ('score', models.FloatField(verbose_name='Показатель')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboards', to='reviews.title', verbose_name='Произведение')),
+            ],
+            options={
+                'verbose_name': 'место в рейтинге',
+                'verbose_name_plural': 'Рейтинги',
+                'ordering': ('kind', 'scope', 'key', 'position'),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboard',
+            constraint=models.UniqueConstraint(fields=('kind', 'scope', 'key', 'position'), name='unique_leaderboard_position'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+from reviews.constants import GENRE_TITLE_INDEX
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_ordering_indexes'),
+    ]
+
+    # Промежуточная таблица создаётся Django автоматически, поэтому
+    # индекс (genre_id, title_id) для фильтров по жанрам задан вручную.
+    operations = [
+        migrations.RunSQL(
+            f'CREATE INDEX {GENRE_TITLE_INDEX} '
+            'ON reviews_title_genre (genre_id, title_id)',
+            f'DROP INDEX {GENRE_TITLE_INDEX}',
+        ),
+    ]
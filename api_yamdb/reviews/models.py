@@ -1,8 +1,19 @@
+from collections import defaultdict
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
-
-from reviews.constants import LIMIT_TEXT, MAX_LENGTH, MAX_SCORE, MIN_SCORE
+from django.db import connections, models, transaction
+from django.db.models import (Avg, Case, Count, F, FloatField, OuterRef, Q,
+                              Subquery, Sum, Value, When, Window)
+from django.db.models.functions import Cast, Coalesce, RowNumber
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from reviews.constants import (LEADERBOARD_SIZE, LIMIT_TEXT, MAX_LENGTH,
+                               MAX_LENGTH_SLUG, MAX_SCORE, MIN_SCORE,
+                               TRENDING_DAYS)
 from reviews.validators import year_validator
 
 User = get_user_model()
@@ -58,6 +69,34 @@ class SlugNameModel(NameBaseModel):
         abstract = True
 
 
+class CounterFieldsModel(models.Model):
+    """
+    Абстрактная модель с денормализованными счётчиками.
+    Счётчики из counter_fields меняются только UPDATE с F()-выражениями,
+    поэтому при сохранении существующего объекта они не записываются:
+    иначе устаревшие значения из памяти затрут конкурентные изменения.
+    """
+
+    counter_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and not args
+            and kwargs.get('update_fields') is None
+            and not kwargs.get('force_insert')
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
 class Group(SlugNameModel):
     """Категории."""
 
@@ -74,7 +113,56 @@ class Genre(SlugNameModel):
         verbose_name_plural = 'Жанры'
 
 
-class Title(NameBaseModel):
+class TitleQuerySet(models.QuerySet):
+    """QuerySet произведений с операциями над хранимым рейтингом."""
+
+    def touch(self):
+        """Отмечает изменение произведения или его отзывов и комментариев."""
+        return self.update(modified=timezone.now())
+
+    def change_rating(self, score_delta, count_delta):
+        """
+        Атомарно сдвигает сумму и количество оценок
+        и пересчитывает рейтинг одним UPDATE.
+        """
+        new_sum = F('rating_sum') + score_delta
+        new_count = F('rating_count') + count_delta
+        return self.update(
+            modified=timezone.now(),
+            rating_sum=new_sum,
+            rating_count=new_count,
+            rating=Case(
+                When(
+                    rating_count__gt=-count_delta,
+                    then=Cast(new_sum, FloatField()) / new_count
+                ),
+                default=None,
+                output_field=FloatField(),
+            ),
+        )
+
+    def recompute_ratings(self):
+        """Пересчитывает рейтинг по всем отзывам одним UPDATE."""
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        return self.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('id')).values('total')),
+                0
+            ),
+            rating=Subquery(
+                reviews.annotate(avg=Avg('score')).values('avg'),
+                output_field=FloatField()
+            ),
+        )
+
+
+class Title(CounterFieldsModel, NameBaseModel):
     """Произведения."""
 
     year = models.PositiveSmallIntegerField(
@@ -90,13 +178,62 @@ class Title(NameBaseModel):
     )
     description = models.TextField(verbose_name='Описание')
     genre = models.ManyToManyField(Genre, verbose_name='Жанр')
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок',
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество оценок',
+    )
+    rating = models.FloatField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Рейтинг',
+    )
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено',
+    )
+
+    objects = TitleQuerySet.as_manager()
+    counter_fields = ('rating_sum', 'rating_count', 'rating')
 
     class Meta(NameBaseModel.Meta):
         verbose_name = 'произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(fields=('name', 'id'), name='title_name_id_idx'),
+            models.Index(fields=('year', 'id'), name='title_year_id_idx'),
+            models.Index(fields=('rating', 'id'), name='title_rating_id_idx'),
+            models.Index(
+                fields=('rating_count', 'id'), name='title_rating_count_id_idx'
+            ),
+        ]
+
+
+class ReviewQuerySet(models.QuerySet):
+    """QuerySet отзывов с операциями над счётчиком комментариев."""
+
+    def change_comment_count(self, delta):
+        """Атомарно сдвигает счётчик комментариев одним UPDATE."""
+        return self.update(comment_count=F('comment_count') + delta)
+
+    def recompute_comment_counts(self):
+        """Пересчитывает счётчик комментариев по всем отзывам."""
+        comments = Comment.objects.filter(
+            review=OuterRef('pk')
+        ).order_by().values('review')
+        return self.update(comment_count=Coalesce(
+            Subquery(comments.annotate(total=Count('id')).values('total')),
+            0
+        ))
 
 
-class Review(AuthorTextCreateModel):
+class Review(CounterFieldsModel, AuthorTextCreateModel):
     """Рецензии."""
 
     title = models.ForeignKey(
@@ -119,6 +256,14 @@ class Review(AuthorTextCreateModel):
             )
         ]
     )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
+
+    objects = ReviewQuerySet.as_manager()
+    counter_fields = ('comment_count',)
 
     class Meta(AuthorTextCreateModel.Meta):
         verbose_name = 'отзыв'
@@ -129,9 +274,51 @@ class Review(AuthorTextCreateModel):
             ),
         ]
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._saved_score = self.__dict__.get('score') if self.pk else None
+
     def __str__(self):
         return f'Отзыв {self.author} на {self.title}'
 
+    def save(self, *args, **kwargs):
+        """
+        Сохраняет отзыв и обновляет рейтинг и распределение оценок
+        произведения.
+        """
+        with transaction.atomic():
+            created = self._state.adding
+            super().save(*args, **kwargs)
+            titles = Title.objects.filter(pk=self.title_id)
+            histograms = RatingHistogram.objects.filter(
+                title_id=self.title_id
+            )
+            if created:
+                titles.change_rating(self.score, 1)
+                histograms.shift(add=self.score)
+            elif self._saved_score not in (None, self.score):
+                titles.change_rating(self.score - self._saved_score, 0)
+                histograms.shift(add=self.score, remove=self._saved_score)
+            else:
+                titles.touch()
+            self._saved_score = self.score
+
+    def delete(self, *args, **kwargs):
+        """
+        Удаляет отзыв и вычитает его оценку из рейтинга и распределения
+        оценок произведения. Каскадные удаления обрабатывают
+        обработчики сигналов удаляемых пользователей.
+        """
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Title.objects.filter(pk=self.title_id).change_rating(
+                -self.score, -1
+            )
+            RatingHistogram.objects.filter(title_id=self.title_id).shift(
+                remove=self.score
+            )
+        return result
+
 
 class Comment(AuthorTextCreateModel):
     """Комментарии к произведениям."""
@@ -149,3 +336,362 @@ class Comment(AuthorTextCreateModel):
 
     def __str__(self):
         return f'Комментарий {self.author} на {self.review}'
+
+    def save(self, *args, **kwargs):
+        """
+        Сохраняет комментарий, обновляет счётчик комментариев отзыва
+        и отмечает изменение произведения.
+        """
+        with transaction.atomic():
+            created = self._state.adding
+            super().save(*args, **kwargs)
+            if created:
+                Review.objects.filter(
+                    pk=self.review_id
+                ).change_comment_count(1)
+            Title.objects.filter(reviews=self.review_id).touch()
+
+    def delete(self, *args, **kwargs):
+        """
+        Удаляет комментарий, уменьшает счётчик комментариев отзыва
+        и отмечает изменение произведения.
+        """
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Review.objects.filter(
+                pk=self.review_id
+            ).change_comment_count(-1)
+            Title.objects.filter(reviews=self.review_id).touch()
+        return result
+
+
+def first_in_partitions(queryset, size):
+    """
+    Возвращает строки queryset с оконной аннотацией position,
+    не дальше size-го места в своей группе, одним запросом.
+    Django не фильтрует по оконным функциям, поэтому запрос
+    оборачивается в подзапрос.
+    """
+    connection = connections[queryset.db]
+    columns = ', '.join(
+        connection.ops.quote_name(name)
+        for name in ('key', 'id', 'score', 'position')
+    )
+    sql, params = queryset.values(
+        'key', 'id', 'score', 'position'
+    ).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT {columns} FROM ({sql}) ranked '
+            f'WHERE {connection.ops.quote_name("position")} <= %s',
+            (*params, size),
+        )
+        return cursor.fetchall()
+
+
+class LeaderboardQuerySet(models.QuerySet):
+    """QuerySet рейтинговых таблиц с их пересчётом."""
+
+    def refresh(self, size=LEADERBOARD_SIZE, trending_days=TRENDING_DAYS):
+        """
+        Пересчитывает все рейтинговые таблицы и заменяет их
+        в одной транзакции. Таблицы каждой области строятся одним
+        запросом с нумерацией мест внутри жанра, категории или года.
+        """
+        Kind, Scope = Leaderboard.Kind, Leaderboard.Scope
+        rated = Title.objects.filter(rating__isnull=False).order_by()
+        top_order = (F('rating').desc(), F('rating_count').desc(), F('id'))
+        trending = Title.objects.filter(
+            reviews__pub_date__gte=timezone.now() - timedelta(
+                days=trending_days
+            )
+        ).order_by().annotate(recent=Count('reviews'))
+        # Вид, область, произведения, ключ таблицы, показатель,
+        # разбиение на таблицы и порядок мест в таблице.
+        scopes = (
+            (Kind.TOP, Scope.ALL, rated, Value(''), 'rating', None, top_order),
+            (
+                Kind.TOP, Scope.GENRE, rated.filter(genre__isnull=False),
+                F('genre__slug'), 'rating', F('genre__slug'), top_order
+            ),
+            (
+                Kind.TOP, Scope.CATEGORY, rated.filter(group__isnull=False),
+                F('group__slug'), 'rating', F('group__slug'), top_order
+            ),
+            (
+                Kind.TOP, Scope.YEAR, rated,
+                F('year'), 'rating', F('year'), top_order
+            ),
+            (
+                Kind.TRENDING, Scope.ALL, trending, Value(''), 'recent',
+                None, (F('recent').desc(), F('id').desc())
+            ),
+        )
+        entries = []
+        for kind, scope, titles, key, score, partition, order in scopes:
+            titles = titles.annotate(
+                key=key,
+                score=F(score),
+                position=Window(
+                    RowNumber(), partition_by=partition, order_by=order
+                ),
+            )
+            entries.extend(
+                Leaderboard(
+                    kind=kind, scope=scope, key=str(key), position=position,
+                    title_id=title_id, score=score,
+                )
+                for key, title_id, score, position in first_in_partitions(
+                    titles, size
+                )
+            )
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(entries)
+        return len(entries)
+
+
+class Leaderboard(models.Model):
+    """
+    Периодически пересчитываемые рейтинги произведений:
+    лучшие в целом, по жанру, категории и году, а также обсуждаемые
+    (число отзывов за последние дни).
+    """
+
+    class Kind(models.TextChoices):
+        TOP = 'top', 'Лучшие'
+        TRENDING = 'trending', 'Обсуждаемые'
+
+    class Scope(models.TextChoices):
+        ALL = 'all', 'Все произведения'
+        GENRE = 'genre', 'Жанр'
+        CATEGORY = 'category', 'Категория'
+        YEAR = 'year', 'Год'
+
+    kind = models.CharField(
+        max_length=MAX_LENGTH_SLUG,
+        choices=Kind.choices,
+        verbose_name='Вид',
+    )
+    scope = models.CharField(
+        max_length=MAX_LENGTH_SLUG,
+        choices=Scope.choices,
+        verbose_name='Область',
+    )
+    key = models.CharField(
+        max_length=MAX_LENGTH_SLUG,
+        blank=True,
+        verbose_name='Жанр, категория или год',
+    )
+    position = models.PositiveIntegerField(verbose_name='Место')
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='leaderboards',
+        verbose_name='Произведение',
+    )
+    score = models.FloatField(verbose_name='Показатель')
+
+    objects = LeaderboardQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'место в рейтинге'
+        verbose_name_plural = 'Рейтинги'
+        ordering = ('kind', 'scope', 'key', 'position')
+        constraints = [
+            models.UniqueConstraint(
+                fields=('kind', 'scope', 'key', 'position'),
+                name='unique_leaderboard_position'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.position}. {self.title}'
+
+
+def score_bucket(score):
+    """Имя поля RatingHistogram, в котором считаются оценки score."""
+    return f'score_{score}'
+
+
+class RatingHistogramQuerySet(models.QuerySet):
+    """QuerySet распределений оценок с их обновлением."""
+
+    def shift(self, add=None, remove=None):
+        """Атомарно переносит оценку между корзинами одним UPDATE."""
+        changes = {}
+        if remove is not None:
+            changes[score_bucket(remove)] = F(score_bucket(remove)) - 1
+        if add is not None:
+            changes[score_bucket(add)] = F(score_bucket(add)) + 1
+        return self.update(**changes)
+
+    def recount(self):
+        """Пересчитывает выбранные распределения оценок одним UPDATE."""
+        reviews = Review.objects.filter(
+            title=OuterRef('title')
+        ).order_by().values('title')
+        return self.update(**{
+            score_bucket(score): Coalesce(
+                Subquery(reviews.filter(score=score).annotate(
+                    total=Count('id')
+                ).values('total')),
+                0
+            )
+            for score in range(MIN_SCORE, MAX_SCORE + 1)
+        })
+
+    def rebuild(self):
+        """Пересчитывает распределения оценок всех произведений."""
+        buckets = defaultdict(dict)
+        for title_id, score, total in Review.objects.order_by().values_list(
+            'title', 'score'
+        ).annotate(total=Count('id')):
+            buckets[title_id][score_bucket(score)] = total
+        histograms = [
+            self.model(title_id=pk, **buckets[pk])
+            for pk in Title.objects.values_list('pk', flat=True)
+        ]
+        with transaction.atomic():
+            self.all().delete()
+            self.bulk_create(histograms)
+        return len(histograms)
+
+
+class RatingHistogram(models.Model):
+    """
+    Распределение оценок произведения: по полю-корзине score_N
+    на каждую оценку от MIN_SCORE до MAX_SCORE, обновляется
+    вместе с рейтингом.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='rating_histogram',
+        verbose_name='Произведение',
+    )
+    score_1 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 1',
+    )
+    score_2 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 2',
+    )
+    score_3 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 3',
+    )
+    score_4 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 4',
+    )
+    score_5 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 5',
+    )
+    score_6 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 6',
+    )
+    score_7 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 7',
+    )
+    score_8 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 8',
+    )
+    score_9 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 9',
+    )
+    score_10 = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Оценок 10',
+    )
+
+    objects = RatingHistogramQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'распределение оценок'
+        verbose_name_plural = 'Распределения оценок'
+
+    def __str__(self):
+        return f'Оценки {self.title}'
+
+    def as_dict(self):
+        return {
+            str(score): getattr(self, score_bucket(score))
+            for score in range(MIN_SCORE, MAX_SCORE + 1)
+        }
+
+
+@receiver(post_save, sender=Title)
+def create_rating_histogram(sender, instance, created, raw=False, **kwargs):
+    """Создаёт пустое распределение оценок для нового произведения."""
+    if created and not raw:
+        RatingHistogram.objects.create(title=instance)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Group)
+def touch_reference_titles(sender, instance, created, raw=False, **kwargs):
+    """
+    Отмечает изменение произведений при изменении их жанра
+    или категории: они входят в ответ произведения.
+    """
+    if not created and not raw:
+        Title.objects.filter(
+            **{'genre' if sender is Genre else 'group': instance}
+        ).touch()
+
+
+@receiver(pre_delete, sender=Genre)
+def touch_genre_titles(sender, instance, **kwargs):
+    """
+    Отмечает изменение произведений удаляемого жанра. Произведения
+    удаляемой категории удаляются вместе с ней.
+    """
+    Title.objects.filter(genre=instance).touch()
+
+
+@receiver(pre_delete, sender=User)
+def remember_author_content(sender, instance, **kwargs):
+    """
+    Запоминает произведения и чужие отзывы, отзывы и комментарии
+    к которым удаляются вместе с пользователем. Они не обрабатываются
+    по одному: обработчики удаления отзывов и комментариев отключили бы
+    быстрое каскадное удаление.
+    """
+    instance._reviewed_title_ids = list(
+        Title.objects.filter(reviews__author=instance).values_list(
+            'pk', flat=True
+        )
+    )
+    instance._commented_review_ids = list(
+        Review.objects.filter(comments__author=instance).exclude(
+            author=instance
+        ).values_list('pk', flat=True).distinct()
+    )
+
+
+@receiver(post_delete, sender=User)
+def recount_author_content(sender, instance, **kwargs):
+    """
+    Пересчитывает рейтинг и распределение оценок произведений
+    и счётчики комментариев отзывов, затронутых удалением пользователя.
+    """
+    title_ids = getattr(instance, '_reviewed_title_ids', ())
+    review_ids = getattr(instance, '_commented_review_ids', ())
+    if title_ids:
+        Title.objects.filter(pk__in=title_ids).recompute_ratings()
+        RatingHistogram.objects.filter(title_id__in=title_ids).recount()
+    if review_ids:
+        Review.objects.filter(pk__in=review_ids).recompute_comment_counts()
+    if title_ids or review_ids:
+        Title.objects.filter(
+            Q(pk__in=title_ids) | Q(reviews__in=review_ids)
+        ).touch()
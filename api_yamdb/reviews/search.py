@@ -0,0 +1,135 @@
+"""
+Поиск по произведениям, жанрам и категориям через индексы.
+
+В SQLite индексы хранятся в виртуальных таблицах FTS5, которые триггеры
+синхронизируют с исходными таблицами при любой записи,
+включая bulk_create. Полнотекстовый поиск по названию и описанию
+произведений использует токенизатор unicode61, поиск подстроки
+в названиях — токенизатор trigram. Индексы создаются миграциями
+0005_title_search и 0006_name_search.
+В PostgreSQL используются GIN-индексы: по выражению to_tsvector
+для полнотекстового поиска и gin_trgm_ops для поиска подстроки,
+отдельная синхронизация не нужна.
+"""
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from reviews.constants import (MIN_TRIGRAM_LENGTH, SEARCH_CONFIG, SEARCH_INDEX,
+                               SEARCH_TABLE)
+
+NAME_SEARCH_TABLES = ('reviews_title', 'reviews_genre', 'reviews_group')
+
+
+def name_index_table(table):
+    return f'{table}_name_trigram'
+
+
+def fts_quote(text):
+    """Экранирует строку как фразу запроса FTS5."""
+    return '"{}"'.format(text.replace('"', '""'))
+
+
+def search_terms(query):
+    """Разбивает поисковую строку на слова, отбрасывая операторы."""
+    return re.findall(r'\w+', query)
+
+
+def name_q(lookup, query):
+    """
+    Условие lookup по названию без учёта регистра.
+    LIKE в SQLite не различает регистр только для ASCII,
+    поэтому проверяются типичные варианты написания.
+    """
+    variants = {query, query.lower(), query.upper(), query.capitalize()}
+    return reduce(
+        or_, (Q(**{f'name__{lookup}': value}) for value in variants)
+    )
+
+
+def postgres_search_vector():
+    from django.contrib.postgres.search import SearchVector
+
+    return SearchVector('name', 'description', config=SEARCH_CONFIG)
+
+
+def search_titles(queryset, query):
+    """
+    Оставляет произведения, подходящие под запрос,
+    и упорядочивает их по релевантности.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        search_query = SearchQuery(' '.join(terms), config=SEARCH_CONFIG)
+        vector = postgres_search_vector()
+        return queryset.annotate(
+            search=vector,
+            search_rank=SearchRank(vector, search_query),
+        ).filter(search=search_query).order_by('-search_rank', '-id')
+    return queryset.extra(
+        tables=[SEARCH_TABLE],
+        where=[
+            f'{SEARCH_TABLE}.rowid = reviews_title.id',
+            f'{SEARCH_TABLE} MATCH %s',
+        ],
+        params=[' '.join(fts_quote(term) for term in terms)],
+        select={'search_rank': f'{SEARCH_TABLE}.rank'},
+    ).order_by('search_rank', '-id')
+
+
+def search_names(queryset, query):
+    """
+    Ищет подстроку в названии без учёта регистра, совпадения
+    с начала названия идут первыми. Триграммный индекс не покрывает
+    строки короче трёх символов, их ищет обычный LIKE по таблице.
+    """
+    query = query.strip()
+    if not query:
+        return queryset
+    prefix = name_q('istartswith', query)
+    prefix_first = Case(
+        When(prefix, then=Value(0)),
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+    ordering = (
+        prefix_first,
+        *(queryset.query.order_by or queryset.model._meta.ordering),
+    )
+    if len(query) < MIN_TRIGRAM_LENGTH:
+        queryset = queryset.filter(name_q('icontains', query))
+    elif connection.vendor == 'sqlite':
+        table = queryset.model._meta.db_table
+        index = name_index_table(table)
+        queryset = queryset.extra(
+            tables=[index],
+            where=[f'{index}.rowid = {table}.id', f'{index} MATCH %s'],
+            params=[fts_quote(query)],
+        )
+    else:
+        queryset = queryset.filter(name__icontains=query)
+    return queryset.order_by(*ordering)
+
+
+def rebuild_search_index(using=connection):
+    """Перестраивает поисковые индексы по текущему содержимому таблиц."""
+    with using.cursor() as cursor:
+        if using.vendor == 'sqlite':
+            for index in (
+                SEARCH_TABLE, *map(name_index_table, NAME_SEARCH_TABLES)
+            ):
+                cursor.execute(
+                    f"INSERT INTO {index}({index}) VALUES ('rebuild')"
+                )
+        elif using.vendor == 'postgresql':
+            for index in (
+                SEARCH_INDEX, *map(name_index_table, NAME_SEARCH_TABLES)
+            ):
+                cursor.execute(f'REINDEX INDEX {index}')
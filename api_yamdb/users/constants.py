@@ -1,3 +1,17 @@
 MAX_LENGTH_ROLE: int = 20
 MAX_LENGTH_CODE: int = 100
 MAX_LENGTH_PSW: int = 128
+
+ROLE_CLAIM: str = 'role'
+SUPERUSER_CLAIM: str = 'is_superuser'
+USERNAME_CLAIM: str = 'username'
+ISSUED_AT_CLAIM: str = 'iat'
+
+MAX_LENGTH_SUBJECT: int = 255
+OUTBOX_BATCH_SIZE: int = 100
+OUTBOX_WORKERS: int = 4
+OUTBOX_MAX_ATTEMPTS: int = 5
+OUTBOX_BACKOFF_SECONDS: int = 30
+OUTBOX_MAX_BACKOFF_SECONDS: int = 60 * 60
+OUTBOX_POLL_INTERVAL: int = 5
+OUTBOX_LEASE_SECONDS: int = 5 * 60
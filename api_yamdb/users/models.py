@@ -1,7 +1,17 @@
+from datetime import timedelta
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import Q
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
 
-from users.constants import MAX_LENGTH_CODE, MAX_LENGTH_PSW, MAX_LENGTH_ROLE
+from users.constants import (MAX_LENGTH_CODE, MAX_LENGTH_PSW, MAX_LENGTH_ROLE,
+                             MAX_LENGTH_SUBJECT, OUTBOX_BACKOFF_SECONDS,
+                             OUTBOX_LEASE_SECONDS, OUTBOX_MAX_ATTEMPTS,
+                             OUTBOX_MAX_BACKOFF_SECONDS)
+from users.tokens import revoke_tokens
 
 
 class User(AbstractUser):
@@ -34,9 +44,30 @@ class User(AbstractUser):
         verbose_name_plural = 'Пользователи'
         ordering = ('id',)
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._saved_claims = self.token_claims() if self.pk else None
+
     def __str__(self):
         return self.username
 
+    def token_claims(self):
+        """Данные пользователя, которые копируются в access-токен."""
+        return (
+            self.__dict__.get('role'),
+            self.__dict__.get('is_superuser'),
+            self.__dict__.get('is_active'),
+            self.__dict__.get('username'),
+        )
+
+    def save(self, *args, **kwargs):
+        """Сохраняет пользователя и отзывает токены с устаревшими данными."""
+        super().save(*args, **kwargs)
+        claims = self.token_claims()
+        if self._saved_claims not in (None, claims):
+            revoke_tokens(self.pk)
+        self._saved_claims = claims
+
     @property
     def is_admin(self):
         return self.role == self.Role.ADMIN or self.is_superuser
@@ -44,3 +75,97 @@ class User(AbstractUser):
     @property
     def is_moderator(self):
         return self.role == self.Role.MODERATOR
+
+
+class OutboxEmailQuerySet(models.QuerySet):
+    """QuerySet очереди писем."""
+
+    def pending(self, max_attempts=OUTBOX_MAX_ATTEMPTS):
+        """Неотправленные письма, у которых остались попытки."""
+        return self.filter(sent_at__isnull=True, attempts__lt=max_attempts)
+
+    def due(self, max_attempts=OUTBOX_MAX_ATTEMPTS):
+        """
+        Письма, которые пора отправить (или повторить отправку)
+        и которые не забрал другой обработчик.
+        """
+        now = timezone.now()
+        return self.pending(max_attempts).filter(
+            Q(claimed_until__isnull=True) | Q(claimed_until__lte=now),
+            next_attempt_at__lte=now,
+        )
+
+    def claim(self, limit, lease=OUTBOX_LEASE_SECONDS):
+        """
+        Забирает до limit писем на lease секунд и возвращает их.
+        Если обработчик упадёт, письма снова станут доступны
+        по истечении срока. UPDATE повторяет условия due(), поэтому
+        письмо, которое успел забрать другой обработчик, не попадёт
+        в результат и без блокировки строк.
+        """
+        ids = list(self.values_list('pk', flat=True)[:limit])
+        claimed_until = timezone.now() + timedelta(seconds=lease)
+        self.filter(pk__in=ids).update(claimed_until=claimed_until)
+        return list(OutboxEmail.objects.filter(
+            pk__in=ids, claimed_until=claimed_until
+        ))
+
+
+class OutboxEmail(models.Model):
+    """
+    Письмо в очереди на отправку. Записывается в одной транзакции
+    с изменением данных и отправляется командой send_outbox.
+    """
+
+    subject = models.CharField(
+        max_length=MAX_LENGTH_SUBJECT, verbose_name='Тема'
+    )
+    message = models.TextField(verbose_name='Текст')
+    recipient = models.EmailField(verbose_name='Получатель')
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name='Поставлено в очередь'
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now, verbose_name='Следующая попытка'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Число попыток'
+    )
+    sent_at = models.DateTimeField(
+        null=True, blank=True, verbose_name='Отправлено'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    claimed_until = models.DateTimeField(
+        null=True, blank=True, verbose_name='Забрано на отправку до'
+    )
+
+    objects = OutboxEmailQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        ordering = ('next_attempt_at', 'id')
+        indexes = [
+            models.Index(
+                fields=('sent_at', 'next_attempt_at'),
+                name='outbox_pending_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} для {self.recipient}'
+
+    def fail(self, error, backoff=OUTBOX_BACKOFF_SECONDS):
+        """Отмечает неудачную попытку и откладывает следующую."""
+        self.attempts += 1
+        self.claimed_until = None
+        self.last_error = str(error)
+        self.next_attempt_at = timezone.now() + timedelta(seconds=min(
+            backoff * 2 ** (self.attempts - 1), OUTBOX_MAX_BACKOFF_SECONDS
+        ))
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    """Отзывает токены удалённого пользователя."""
+    revoke_tokens(instance.pk)
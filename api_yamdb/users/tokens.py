@@ -0,0 +1,52 @@
+"""
+Access-токены с ролью пользователя и их отзыв.
+
+Токен, выданный TokenView, содержит роль, is_superuser и username,
+поэтому проверка прав не требует запроса к таблице пользователей.
+Когда эти данные меняются или пользователь удаляется, время отзыва
+записывается в кеш на срок жизни access-токена: более старые токены
+пользователя перестают приниматься, а новые уже содержат актуальные
+данные. User.save() отзывает токены сам; массовые изменения этих данных
+(bulk_update, QuerySet.update) его не вызывают и должны вызывать
+revoke_tokens явно, как import_csv --upsert. Для нескольких процессов
+нужен общий кеш (например, Redis).
+"""
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.constants import (ISSUED_AT_CLAIM, ROLE_CLAIM, SUPERUSER_CLAIM,
+                             USERNAME_CLAIM)
+
+
+def denylist_key(user_id):
+    return f'jwt-denylist:{user_id}'
+
+
+def access_token_for(user):
+    """Выдаёт access-токен с ролью и правами пользователя."""
+    token = AccessToken.for_user(user)
+    token[ROLE_CLAIM] = user.role
+    token[SUPERUSER_CLAIM] = user.is_superuser
+    token[USERNAME_CLAIM] = user.username
+    token[ISSUED_AT_CLAIM] = timezone.now().timestamp()
+    return token
+
+
+def revoke_tokens(user_id):
+    """Отзывает все выданные пользователю до этого момента токены."""
+    cache.set(
+        denylist_key(user_id),
+        timezone.now().timestamp(),
+        api_settings.ACCESS_TOKEN_LIFETIME.total_seconds(),
+    )
+
+
+def is_revoked(token):
+    revoked_at = cache.get(
+        denylist_key(token[api_settings.USER_ID_CLAIM])
+    )
+    return revoked_at is not None and (
+        token.get(ISSUED_AT_CLAIM, 0) <= revoked_at
+    )
@@ -0,0 +1,19 @@
+from contextlib import contextmanager
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.fixture
+def query_budget():
+    @contextmanager
+    def budget(limit):
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        assert len(context) <= limit, (
+            f'Запрос выполнил {len(context)} SQL-запросов при бюджете '
+            f'{limit}:\n'
+            + '\n'.join(query['sql'] for query in context.captured_queries)
+        )
+    return budget
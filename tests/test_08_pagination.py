@@ -0,0 +1,61 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.pagination import PubDatePagination
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08CursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_titles_cursor(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = client.get(f'{self.TITLES_URL}?cursor=')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}?cursor=` '
+            'возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в курсорном режиме пагинации ответ не содержит '
+            'ключ `count`.'
+        )
+        assert [title['id'] for title in data['results']] == sorted(
+            (title['id'] for title in titles), reverse=True
+        ), (
+            'Проверьте, что в курсорном режиме произведения отсортированы '
+            'по убыванию `id`.'
+        )
+
+        response = client.get(self.TITLES_URL)
+        assert response.json().get('count') == len(titles), (
+            'Проверьте, что без параметра `cursor` используется постраничная '
+            'пагинация с ключом `count`.'
+        )
+
+    def test_02_reviews_cursor_pages(self, admin_client, admin, user_client,
+                                     user, moderator_client, moderator,
+                                     monkeypatch):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        reviews, titles = create_reviews(admin_client, author_map)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        monkeypatch.setattr(PubDatePagination, 'page_size', 2)
+
+        collected = []
+        next_url = f'{url}?cursor='
+        while next_url:
+            data = admin_client.get(next_url).json()
+            collected.extend(review['id'] for review in data['results'])
+            next_url = data['next']
+        assert collected == [review['id'] for review in reviews], (
+            f'Проверьте, что курсорная пагинация `{url}` обходит все отзывы '
+            'в порядке публикации.'
+        )
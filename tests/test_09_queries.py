@@ -0,0 +1,92 @@
+import pytest
+
+from reviews.models import Comment, Review, Title
+from tests.utils import create_categories, create_titles
+
+LISTING_QUERY_BUDGET = 3
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09QueryCount:
+
+    CATEGORY_URL = '/api/v1/categories/'
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_titles_list_queries(self, client, admin_client,
+                                    django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        with django_assert_num_queries(3):
+            client.get(self.TITLES_URL)
+
+        source = Title.objects.get(id=titles[0]['id'])
+        for idx in range(8):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000,
+                group=source.group, description='Описание'
+            )
+            title.genre.set(source.genre.all())
+        with django_assert_num_queries(3):
+            client.get(self.TITLES_URL)
+
+    def test_02_title_detail_queries(self, client, admin_client,
+                                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        with django_assert_num_queries(3):
+            client.get(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(
+                    title_id=titles[0]['id']
+                )
+            )
+
+    def test_03_reviews_and_comments_queries(self, client, admin_client,
+                                             django_user_model,
+                                             query_budget):
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(id=titles[0]['id'])
+        first_review = None
+        for page_size in (1, 10):
+            for idx in range(Review.objects.count(), page_size):
+                author = django_user_model.objects.create_user(
+                    username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+                )
+                review = Review.objects.create(
+                    title=title, author=author, text='Текст', score=5
+                )
+                first_review = first_review or review
+                Comment.objects.create(
+                    review=first_review, author=author, text='Текст'
+                )
+            with query_budget(LISTING_QUERY_BUDGET):
+                client.get(
+                    self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+                )
+            with query_budget(LISTING_QUERY_BUDGET):
+                client.get(self.COMMENTS_URL_TEMPLATE.format(
+                    title_id=title.id, review_id=first_review.id
+                ))
+
+    def test_04_reference_lists_cached(self, client, admin_client,
+                                       django_assert_num_queries):
+        categories = create_categories(admin_client)
+        for url in (self.CATEGORY_URL, f'{self.CATEGORY_URL}?search=Фильм'):
+            expected = client.get(url).json()
+            with django_assert_num_queries(0):
+                assert client.get(url).json() == expected, (
+                    f'Проверьте, что повторный GET-запрос к `{url}` '
+                    'возвращает закэшированный ответ.'
+                )
+
+        admin_client.delete(f'{self.CATEGORY_URL}{categories[0]["slug"]}/')
+        slugs = [
+            category['slug']
+            for category in client.get(self.CATEGORY_URL).json()['results']
+        ]
+        assert slugs == [categories[1]['slug']], (
+            'Проверьте, что удаление категории сбрасывает кэш '
+            f'`{self.CATEGORY_URL}`.'
+        )
@@ -0,0 +1,80 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Genre
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10ConditionalGet:
+
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def test_01_not_modified(self, client, admin_client, admin,
+                             django_assert_num_queries):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        for url in (
+            self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+        ):
+            response = client.get(url)
+            etag = response.get('ETag')
+            assert etag and response.get('Last-Modified'), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'заголовки `ETag` и `Last-Modified`.'
+            )
+            with django_assert_num_queries(1):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с актуальным '
+                '`If-None-Match` возвращает ответ со статусом 304.'
+            )
+
+    def test_02_modified_after_review_change(self, client, admin_client,
+                                             admin):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client}
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        etag = client.get(url)['ETag']
+
+        admin_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[0]['id']
+            ),
+            data={'text': 'Новый текст'}
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после изменения отзыва GET-запрос к `{url}` '
+            'со старым `If-None-Match` возвращает ответ со статусом 200.'
+        )
+
+    def test_03_modified_after_genre_change(self, client, admin_client,
+                                            admin):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        genre = Genre.objects.filter(title=titles[0]['id']).first()
+        etag = client.get(url)['ETag']
+        genre.name = 'Новое название'
+        genre.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после изменения жанра GET-запрос к `{url}` '
+            'со старым `If-None-Match` возвращает ответ со статусом 200.'
+        )
+        etag = response['ETag']
+        admin_client.delete(f'/api/v1/genres/{genre.slug}/')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после удаления жанра GET-запрос к `{url}` '
+            'со старым `If-None-Match` возвращает ответ со статусом 200.'
+        )
+        assert genre.slug not in {
+            item['slug'] for item in response.json()['genre']
+        }
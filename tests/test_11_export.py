@@ -0,0 +1,54 @@
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11Export:
+
+    EXPORT_URL = '/api/v1/titles/export/'
+
+    def test_01_export_permissions(self, client, user_client,
+                                   moderator_client):
+        for api_client, status in (
+            (client, HTTPStatus.UNAUTHORIZED),
+            (user_client, HTTPStatus.FORBIDDEN),
+            (moderator_client, HTTPStatus.FORBIDDEN),
+        ):
+            response = api_client.get(self.EXPORT_URL)
+            assert response.status_code == status, (
+                f'Проверьте, что `{self.EXPORT_URL}` доступен только '
+                'администратору.'
+            )
+
+    def test_02_export_titles(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+
+        response = admin_client.get(self.EXPORT_URL)
+        assert response.status_code == HTTPStatus.OK
+        rows = [
+            json.loads(line)
+            for line in b''.join(response.streaming_content).splitlines()
+        ]
+        assert [
+            (row['name'], row['description']) for row in rows
+        ] == [(title['name'], title['description']) for title in titles], (
+            f'Проверьте, что `{self.EXPORT_URL}` выгружает все произведения '
+            'в формате NDJSON.'
+        )
+
+        response = admin_client.get(f'{self.EXPORT_URL}?output=csv')
+        lines = b''.join(
+            response.streaming_content
+        ).decode().splitlines()
+        assert lines[0] == 'id,name,year,category,description', (
+            f'Проверьте, что `{self.EXPORT_URL}?output=csv` использует '
+            'колонки titles.csv.'
+        )
+        assert len(lines) == len(titles) + 1
+
+        response = admin_client.get(f'{self.EXPORT_URL}?output=xml')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,87 @@
+import pytest
+
+from reviews.models import Title
+from reviews.search import rebuild_search_index
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'q': query})
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_full_text_search(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert self.search(client, 'терминатор') == [titles[0]['name']], (
+            f'Проверьте, что `{self.TITLES_URL}?q=` ищет по названию '
+            'произведения без учёта регистра.'
+        )
+        assert self.search(client, 'ki yay') == [titles[1]['name']], (
+            f'Проверьте, что `{self.TITLES_URL}?q=` ищет по описанию '
+            'произведения.'
+        )
+        assert self.search(client, 'back "') == [titles[0]['name']]
+        assert self.search(client, 'несуществующее') == []
+
+    def test_02_index_follows_changes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/', data={'name': 'Чужой'}
+        )
+        assert self.search(client, 'Чужой') == ['Чужой']
+        assert self.search(client, 'Терминатор') == []
+
+        admin_client.delete(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        assert self.search(client, 'Чужой') == []
+
+        Title.objects.filter(id=titles[1]['id']).update(name='Хищник')
+        rebuild_search_index()
+        assert self.search(client, 'Хищник') == ['Хищник']
+
+    def test_03_name_substring_search(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        response = client.get('/api/v1/genres/', {'search': 'меди'})
+        assert [genre['slug'] for genre in response.json()['results']] == [
+            'comedy'
+        ], (
+            'Проверьте, что `/api/v1/genres/?search=` находит жанр по '
+            'подстроке названия без учёта регистра.'
+        )
+        response = client.get('/api/v1/categories/', {'search': 'кн'})
+        assert [
+            category['slug'] for category in response.json()['results']
+        ] == ['books'], (
+            'Проверьте, что `/api/v1/categories/?search=` находит категорию '
+            'по началу названия.'
+        )
+        response = client.get('/api/v1/categories/', {'search': 'иг'})
+        assert [
+            category['slug'] for category in response.json()['results']
+        ] == ['books'], (
+            'Проверьте, что `/api/v1/categories/?search=` находит категорию '
+            'по подстроке названия короче трёх символов.'
+        )
+        response = client.get(self.TITLES_URL, {'search': 'ЕШЕК'})
+        assert [title['name'] for title in response.json()['results']] == [
+            titles[1]['name']
+        ], (
+            f'Проверьте, что `{self.TITLES_URL}?search=` находит '
+            'произведение по подстроке названия.'
+        )
+
+    def test_04_name_search_prefix_first(self, client, admin_client):
+        for name, slug in (('Антиутопия', 'dystopia'), ('Утопия', 'utopia')):
+            admin_client.post(
+                '/api/v1/genres/', data={'name': name, 'slug': slug}
+            )
+        response = client.get('/api/v1/genres/', {'search': 'утоп'})
+        assert [genre['slug'] for genre in response.json()['results']] == [
+            'utopia', 'dystopia'
+        ], (
+            'Проверьте, что совпадения с начала названия идут в результатах '
+            'поиска первыми.'
+        )
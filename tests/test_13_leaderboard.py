@@ -0,0 +1,81 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Leaderboard
+from tests.utils import create_rated_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13Leaderboard:
+
+    TOP_URL = '/api/v1/titles/top/'
+    TRENDING_URL = '/api/v1/titles/trending/'
+
+    def create_leaderboards(self, admin_client, user_client,
+                            moderator_client):
+        titles, categories, genres = create_rated_titles(
+            admin_client, user_client, moderator_client
+        )
+        Leaderboard.objects.refresh()
+        return titles, categories, genres
+
+    def names(self, client, url, params=None):
+        response = client.get(url, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        return [title['name'] for title in response.json()]
+
+    def test_01_top(self, client, admin_client, user_client,
+                    moderator_client, django_assert_num_queries):
+        titles, categories, genres = self.create_leaderboards(
+            admin_client, user_client, moderator_client
+        )
+        with django_assert_num_queries(2):
+            names = self.names(client, self.TOP_URL)
+        assert names == [titles[1]['name'], titles[0]['name']], (
+            f'Проверьте, что `{self.TOP_URL}` возвращает произведения '
+            'по убыванию рейтинга.'
+        )
+        assert self.names(
+            client, self.TOP_URL, {'genre': genres[0]['slug']}
+        ) == [titles[0]['name']]
+        assert self.names(
+            client, self.TOP_URL, {'category': categories[1]['slug']}
+        ) == [titles[1]['name']]
+        assert self.names(
+            client, self.TOP_URL, {'year': titles[0]['year']}
+        ) == [titles[0]['name']]
+        assert self.names(client, self.TOP_URL, {'limit': 1}) == [
+            titles[1]['name']
+        ]
+        response = client.get(
+            self.TOP_URL, {'genre': genres[0]['slug'], 'year': 1984}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_trending(self, client, admin_client, user_client,
+                         moderator_client):
+        titles, _, _ = self.create_leaderboards(
+            admin_client, user_client, moderator_client
+        )
+        assert self.names(client, self.TRENDING_URL) == [
+            titles[1]['name'], titles[0]['name']
+        ], (
+            f'Проверьте, что `{self.TRENDING_URL}` упорядочивает '
+            'произведения по числу недавних отзывов.'
+        )
+
+    def test_03_refresh_queries(self, admin_client, user_client,
+                                moderator_client, django_assert_num_queries):
+        create_rated_titles(admin_client, user_client, moderator_client)
+        with django_assert_num_queries(8):
+            Leaderboard.objects.refresh()
+        assert Leaderboard.objects.filter(
+            scope=Leaderboard.Scope.GENRE
+        ).exists(), (
+            'Проверьте, что таблицы по жанрам строятся одним запросом '
+            'на все жанры.'
+        )
@@ -0,0 +1,66 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_rated_titles, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14Ordering:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def names(self, client, ordering):
+        response = client.get(self.TITLES_URL, {'ordering': ordering})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с параметром '
+            '`ordering` возвращает ответ со статусом 200.'
+        )
+        return [title['name'] for title in response.json()['results']]
+
+    @pytest.mark.parametrize('ordering,expected', (
+        ('name', (1, 0)),
+        ('-name', (0, 1)),
+        ('year', (0, 1)),
+        ('-year', (1, 0)),
+        ('rating', (0, 1)),
+        ('-rating', (1, 0)),
+        ('review_count', (0, 1)),
+        ('-review_count', (1, 0)),
+    ))
+    def test_01_ordering(self, client, admin_client, user_client,
+                         moderator_client, ordering, expected):
+        titles, _, _ = create_rated_titles(
+            admin_client, user_client, moderator_client
+        )
+        assert self.names(client, ordering) == [
+            titles[idx]['name'] for idx in expected
+        ], (
+            f'Проверьте, что `{self.TITLES_URL}?ordering={ordering}` '
+            'возвращает произведения в нужном порядке.'
+        )
+
+    def test_02_unknown_field_ignored(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        assert self.names(client, 'description') == [
+            titles[1]['name'], titles[0]['name']
+        ], (
+            'Проверьте, что сортировка по неподдерживаемому полю '
+            'игнорируется и используется порядок по умолчанию.'
+        )
+
+    def test_03_ordering_uses_index(self, client, admin_client,
+                                    django_assert_num_queries):
+        create_titles(admin_client)
+        with django_assert_num_queries(3) as context:
+            self.names(client, '-rating')
+        select = next(
+            query['sql'] for query in context.captured_queries
+            if 'ORDER BY' in query['sql']
+        )
+        assert '"reviews_title"."rating" DESC, "reviews_title"."id" DESC' in (
+            select
+        ), (
+            'Проверьте, что при сортировке по рейтингу дополнительный '
+            'ключ id идёт в том же направлении, что и основной.'
+        )
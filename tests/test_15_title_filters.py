@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_rated_titles, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleFilters:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def names(self, client, params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с фильтрами '
+            f'{params} возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        assert data['count'] == len(data['results']), (
+            'Проверьте, что фильтры по жанрам не дублируют произведения.'
+        )
+        return sorted(title['name'] for title in data['results'])
+
+    def test_01_genre_in(self, client, admin_client, user_client,
+                         moderator_client):
+        titles, _, genres = create_rated_titles(
+            admin_client, user_client, moderator_client
+        )
+        all_names = sorted(title['name'] for title in titles)
+        slugs = ','.join(genre['slug'] for genre in genres)
+        assert self.names(client, {'genre__in': slugs}) == all_names, (
+            'Проверьте, что фильтр `genre__in` по умолчанию возвращает '
+            'произведения хотя бы с одним из жанров.'
+        )
+        assert self.names(
+            client, {'genre__in': slugs, 'genre_match': 'all'}
+        ) == [], (
+            'Проверьте, что с `genre_match=all` возвращаются только '
+            'произведения со всеми указанными жанрами.'
+        )
+        both = f'{genres[0]["slug"]},{genres[1]["slug"]}'
+        assert self.names(
+            client, {'genre__in': both, 'genre_match': 'all'}
+        ) == [titles[0]['name']]
+        assert self.names(
+            client, {'genre': genres[0]['slug']}
+        ) == [titles[0]['name']]
+
+    def test_02_ranges(self, client, admin_client, user_client,
+                       moderator_client):
+        titles, _, _ = create_rated_titles(
+            admin_client, user_client, moderator_client
+        )
+        assert self.names(
+            client, {'year__gte': 1985, 'year__lte': 1990}
+        ) == [titles[1]['name']], (
+            'Проверьте фильтрацию произведений по диапазону годов.'
+        )
+        assert self.names(client, {'rating__gte': 5}) == [titles[1]['name']]
+        assert self.names(client, {'rating__lte': 5}) == [titles[0]['name']]
+        assert self.names(client, {'min_reviews': 2}) == [titles[1]['name']], (
+            'Проверьте, что фильтр `min_reviews` оставляет произведения '
+            'с не меньшим числом отзывов.'
+        )
+
+    def test_03_invalid_values(self, client, admin_client):
+        create_titles(admin_client)
+        for params in ({'genre_match': 'some'}, {'year__gte': 'abc'}):
+            response = client.get(self.TITLES_URL, params)
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что некорректный фильтр {params} возвращает '
+                'ответ со статусом 400.'
+            )
+
+    def test_04_genre_filter_uses_exists(self, client, admin_client,
+                                         django_assert_num_queries):
+        _, _, genres = create_titles(admin_client)
+        with django_assert_num_queries(3) as context:
+            client.get(
+                self.TITLES_URL, {'genre__in': genres[0]['slug']}
+            )
+        assert any(
+            'EXISTS' in query['sql'] for query in context.captured_queries
+        ), 'Проверьте, что фильтр по жанрам использует подзапрос EXISTS.'
@@ -0,0 +1,106 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.pagination import EstimatedCountPagination, TitlePagination
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Counts:
+
+    TITLES_URL = '/api/v1/titles/'
+    USERS_URL = '/api/v1/users/'
+
+    def get_data(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        return response.json()
+
+    def test_01_small_lists_are_exact(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        data = self.get_data(admin_client, self.TITLES_URL)
+        assert data['count'] == len(titles) and data['count_exact'], (
+            'Проверьте, что для небольших списков ответ содержит точное '
+            'число объектов и `count_exact` равен True.'
+        )
+
+    def test_02_review_count_from_counter(self, client, admin_client, admin,
+                                          user_client, user,
+                                          moderator_client, moderator,
+                                          django_assert_num_queries):
+        reviews, titles = create_reviews(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        })
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/reviews/'
+        with django_assert_num_queries(3) as context:
+            data = self.get_data(client, url)
+        assert data['count'] == len(reviews) and data['count_exact'], (
+            f'Проверьте, что `{url}` возвращает точное число отзывов.'
+        )
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        ), (
+            'Проверьте, что число отзывов берётся из счётчика произведения, '
+            'а не из COUNT(*).'
+        )
+
+    def test_03_estimate_above_limit(self, admin_client, monkeypatch):
+        monkeypatch.setattr(
+            EstimatedCountPagination, 'exact_count_limit', 0
+        )
+        titles, _, _ = create_titles(admin_client)
+        data = self.get_data(admin_client, self.TITLES_URL)
+        assert data['count'] == len(titles), (
+            'Проверьте, что оценка числа объектов совпадает с числом '
+            'на момент подсчёта.'
+        )
+        assert data['count_exact'] is False, (
+            'Проверьте, что выше порога ответ содержит `count_exact` '
+            'равный False.'
+        )
+        admin_client.post(self.TITLES_URL, data={
+            'name': 'Чужой', 'year': 1979, 'description': 'Космос',
+            'genre': titles[0]['genre'], 'category': titles[0]['category'],
+        })
+        assert self.get_data(
+            admin_client, self.TITLES_URL
+        )['count'] == len(titles), (
+            'Проверьте, что оценка числа объектов кешируется.'
+        )
+        users = self.get_data(admin_client, self.USERS_URL)
+        assert users['count_exact'] is False
+
+    def test_04_pages_beyond_estimate(self, admin_client, monkeypatch):
+        monkeypatch.setattr(
+            EstimatedCountPagination, 'exact_count_limit', 0
+        )
+        monkeypatch.setattr(TitlePagination, 'page_size', 1)
+        titles, _, _ = create_titles(admin_client)
+        assert self.get_data(
+            admin_client, self.TITLES_URL
+        )['count'] == len(titles)
+        admin_client.post(self.TITLES_URL, data={
+            'name': 'Чужой', 'year': 1979, 'description': 'Космос',
+            'genre': titles[0]['genre'], 'category': titles[0]['category'],
+        })
+        last = len(titles) + 1
+        data = self.get_data(admin_client, f'{self.TITLES_URL}?page={last}')
+        assert len(data['results']) == 1 and data['next'] is None, (
+            'Проверьте, что страницы за пределами кешированной оценки '
+            'числа объектов доступны, пока в них есть данные.'
+        )
+        data = self.get_data(
+            admin_client, f'{self.TITLES_URL}?page={last - 1}'
+        )
+        assert data['next'], (
+            'Проверьте, что при оценочном числе объектов ссылка на '
+            'следующую страницу определяется по данным, а не по оценке.'
+        )
+        response = admin_client.get(f'{self.TITLES_URL}?page={last + 1}')
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,137 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import RatingHistogram, Review, Title
+from tests.utils import (create_comments, create_single_comment,
+                         create_single_review, create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Counters:
+
+    def create_data(self, admin_client, admin, user_client, user):
+        return create_comments(admin_client, {
+            admin: admin_client,
+            user: user_client,
+        })
+
+    def test_01_counters_in_responses(self, client, admin_client, admin,
+                                      user_client, user):
+        comments, reviews, titles = self.create_data(
+            admin_client, admin, user_client, user
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(title_url).json()['review_count'] == len(
+            reviews
+        ), (
+            f'Проверьте, что ответ `{title_url}` содержит поле '
+            '`review_count` с числом отзывов.'
+        )
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+        assert client.get(review_url).json()['comment_count'] == len(
+            comments
+        ), (
+            f'Проверьте, что ответ `{review_url}` содержит поле '
+            '`comment_count` с числом комментариев.'
+        )
+        admin_client.delete(f'{review_url}comments/{comments[0]["id"]}/')
+        assert client.get(review_url).json()['comment_count'] == len(
+            comments
+        ) - 1, (
+            'Проверьте, что при удалении комментария счётчик уменьшается.'
+        )
+        response = client.get(f'{review_url}comments/').json()
+        assert response['count'] == len(comments) - 1
+
+    def test_02_recompute_counters(self, admin_client, admin, user_client,
+                                   user):
+        comments, reviews, titles = self.create_data(
+            admin_client, admin, user_client, user
+        )
+        Title.objects.update(rating_count=0, rating_sum=0, rating=None)
+        Review.objects.update(comment_count=0)
+        call_command('recompute_counters', stdout=StringIO())
+        assert Title.objects.get(
+            pk=titles[0]['id']
+        ).rating_count == len(reviews), (
+            'Проверьте, что команда `recompute_counters` восстанавливает '
+            'число отзывов произведения.'
+        )
+        assert Review.objects.get(
+            pk=reviews[0]['id']
+        ).comment_count == len(comments), (
+            'Проверьте, что команда `recompute_counters` восстанавливает '
+            'число комментариев к отзыву.'
+        )
+
+    def test_03_title_save_keeps_rating(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        create_single_review(user_client, title.pk, 'Ого', 8)
+        title.name = 'Новое название'
+        title.save()
+        title = Title.objects.get(pk=title.pk)
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            8, 1, 8
+        ), (
+            'Проверьте, что сохранение ранее загруженного произведения '
+            'не перезаписывает рейтинг, изменённый отзывами.'
+        )
+        assert title.name == 'Новое название'
+        admin_client.patch(f'/api/v1/titles/{title.pk}/', data={
+            'year': 1990
+        })
+        assert Title.objects.get(pk=title.pk).rating == 8
+
+    def test_04_review_save_keeps_comment_count(self, admin_client, admin,
+                                                user_client, user):
+        comments, reviews, titles = self.create_data(
+            admin_client, admin, user_client, user
+        )
+        review = Review.objects.get(pk=reviews[0]['id'])
+        create_single_comment(
+            user_client, titles[0]['id'], review.pk, 'Ещё комментарий'
+        )
+        review.text = 'Новый текст'
+        review.save()
+        assert Review.objects.get(
+            pk=review.pk
+        ).comment_count == len(comments) + 1, (
+            'Проверьте, что сохранение ранее загруженного отзыва '
+            'не перезаписывает счётчик комментариев.'
+        )
+
+    def test_05_author_delete_recounts_rating(self, admin_client,
+                                              user_client, user):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Отлично', 8)
+        create_single_review(user_client, title_id, 'Плохо', 2)
+        user.delete()
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count, title.rating) == (
+            8, 1, 8
+        ), (
+            'Проверьте, что при удалении пользователя его оценки '
+            'вычитаются из рейтинга произведения.'
+        )
+        histogram = RatingHistogram.objects.get(title_id=title_id)
+        assert (histogram.score_2, histogram.score_8) == (0, 1), (
+            'Проверьте, что при удалении пользователя его оценки '
+            'вычитаются из распределения оценок.'
+        )
+
+    def test_06_author_delete_recounts_comments(self, admin_client, admin,
+                                                user_client, user):
+        comments, reviews, titles = self.create_data(
+            admin_client, admin, user_client, user
+        )
+        user.delete()
+        assert Review.objects.get(
+            pk=reviews[0]['id']
+        ).comment_count == len(comments) - 1, (
+            'Проверьте, что при удалении пользователя его комментарии '
+            'вычитаются из счётчика комментариев отзыва.'
+        )
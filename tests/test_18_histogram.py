@@ -0,0 +1,82 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import RatingHistogram
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Histogram:
+
+    def histogram_url(self, title_id):
+        return f'/api/v1/titles/{title_id}/rating-histogram/'
+
+    def expected(self, **counts):
+        return {str(score): counts.get(f's{score}', 0) for score in range(
+            1, 11
+        )}
+
+    def test_01_histogram(self, client, admin_client, user_client,
+                          moderator_client, django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = self.histogram_url(title_id)
+        review = create_single_review(
+            user_client, title_id, 'Так себе', 3
+        ).json()
+        create_single_review(moderator_client, title_id, 'Ого', 8)
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        assert response.json() == self.expected(s3=1, s8=1), (
+            f'Проверьте, что `{url}` возвращает число оценок по каждому '
+            'значению от 1 до 10.'
+        )
+        review_url = f'/api/v1/titles/{title_id}/reviews/{review["id"]}/'
+        user_client.patch(review_url, data={'score': 8})
+        assert client.get(url).json() == self.expected(s8=2), (
+            'Проверьте, что при изменении оценки распределение обновляется.'
+        )
+        user_client.delete(review_url)
+        assert client.get(url).json() == self.expected(s8=1), (
+            'Проверьте, что при удалении отзыва распределение обновляется.'
+        )
+        assert client.get(
+            self.histogram_url(titles[1]['id'])
+        ).json() == self.expected()
+        assert client.get(
+            self.histogram_url(0)
+        ).status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_optional_field(self, client, admin_client, user_client,
+                               django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Шедевр', 10)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert 'rating_histogram' not in client.get(url).json(), (
+            'Проверьте, что распределение оценок выводится в произведении '
+            'только по параметру `histogram`.'
+        )
+        data = client.get(url, {'histogram': 1}).json()
+        assert data['rating_histogram'] == self.expected(s10=1)
+        with django_assert_num_queries(3):
+            client.get('/api/v1/titles/', {'histogram': 1})
+
+    def test_03_rebuild(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Шедевр', 10)
+        RatingHistogram.objects.all().delete()
+        call_command('recompute_counters', stdout=StringIO())
+        assert RatingHistogram.objects.get(
+            title_id=titles[0]['id']
+        ).as_dict() == self.expected(s10=1), (
+            'Проверьте, что команда `recompute_counters` восстанавливает '
+            'распределение оценок.'
+        )
+        assert RatingHistogram.objects.count() == len(titles)
@@ -0,0 +1,71 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import IntegrityError
+
+from reviews.models import Review
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ReviewWrites:
+
+    def url(self, title_id):
+        return f'/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_create_query_count(self, admin_client, user_client,
+                                   django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = self.url(titles[0]['id'])
+        with django_assert_num_queries(6) as context:
+            response = user_client.post(url, data={'text': 'Ого', 'score': 8})
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос к `{url}` с корректными данными '
+            'возвращает ответ со статусом 201.'
+        )
+        assert not any(
+            query['sql'].startswith('SELECT "reviews_title"."id"')
+            or 'FROM "reviews_review"' in query['sql']
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что при создании отзыва произведение не загружается '
+            'целиком, а уникальность отзыва проверяется ограничением БД.'
+        )
+
+    def test_02_duplicate_review(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.url(titles[0]['id'])
+        user_client.post(url, data={'text': 'Ого', 'score': 8})
+        response = user_client.post(url, data={'text': 'Ещё', 'score': 2})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что повторный отзыв пользователя на то же '
+            'произведение возвращает ответ со статусом 400.'
+        )
+        assert response.json() == {'non_field_errors': [
+            'Пользователь может оставить только один отзыв к произведению!'
+        ]}
+        assert Review.objects.get().score == 8, (
+            'Проверьте, что повторный отзыв не меняет рейтинг и отзывы.'
+        )
+
+    def test_03_missing_title(self, user_client):
+        response = user_client.post(
+            self.url(0), data={'text': 'Ого', 'score': 8}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что отзыв на несуществующее произведение '
+            'возвращает ответ со статусом 404.'
+        )
+
+    def test_04_other_integrity_errors_raised(self, admin_client,
+                                              user_client, monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+
+        def fail(*args, **kwargs):
+            raise IntegrityError('FOREIGN KEY constraint failed')
+
+        monkeypatch.setattr(Review, 'save', fail)
+        with pytest.raises(IntegrityError):
+            user_client.post(
+                self.url(titles[0]['id']), data={'text': 'Ого', 'score': 8}
+            )
@@ -0,0 +1,147 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Comment, Review
+from tests.utils import create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20MutationQueries:
+
+    def create_data(self, admin_client, admin, user_client, user):
+        comments, reviews, titles = create_comments(admin_client, {
+            admin: admin_client,
+            user: user_client,
+        })
+        review_url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/'
+        )
+        comment_url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+            f'comments/{comments[1]["id"]}/'
+        )
+        return titles, review_url, comment_url
+
+    def assert_author_not_loaded(self, context):
+        assert sum(
+            'FROM "users_user"' in query['sql']
+            for query in context.captured_queries
+        ) == 1, (
+            'Проверьте, что при проверке прав автор сравнивается по id '
+            'и не загружается отдельным запросом.'
+        )
+
+    def create_discussed_titles(self, admin_client, django_user_model,
+                                authors=20):
+        titles, categories, _ = create_titles(admin_client)
+        django_user_model.objects.bulk_create(
+            django_user_model(username=f'author{idx}',
+                              email=f'author{idx}@yamdb.fake')
+            for idx in range(authors)
+        )
+        users = list(
+            django_user_model.objects.filter(username__startswith='author')
+        )
+        for title in titles:
+            Review.objects.bulk_create(
+                Review(title_id=title['id'], author=author, text='Ну',
+                       score=5)
+                for author in users
+            )
+            Comment.objects.bulk_create(
+                Comment(review=review, author=author, text='Ну')
+                for review in Review.objects.filter(title_id=title['id'])
+                for author in users
+            )
+        return titles, categories
+
+    def test_01_review_mutations(self, admin_client, admin, user_client,
+                                 user, django_assert_num_queries):
+        _, review_url, _ = self.create_data(
+            admin_client, admin, user_client, user
+        )
+        with django_assert_num_queries(6) as context:
+            response = user_client.patch(review_url, data={'score': 2})
+        assert response.status_code == HTTPStatus.OK
+        self.assert_author_not_loaded(context)
+        with django_assert_num_queries(7):
+            response = user_client.delete(review_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+    def test_02_comment_mutations(self, admin_client, admin, user_client,
+                                  user, django_assert_num_queries):
+        _, _, comment_url = self.create_data(
+            admin_client, admin, user_client, user
+        )
+        with django_assert_num_queries(5) as context:
+            response = user_client.patch(comment_url, data={'text': 'Ну'})
+        assert response.status_code == HTTPStatus.OK
+        self.assert_author_not_loaded(context)
+        with django_assert_num_queries(6):
+            response = user_client.delete(comment_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+
+    def test_03_comment_scoped_by_title(self, client, admin_client, admin,
+                                        user_client, user):
+        titles, _, comment_url = self.create_data(
+            admin_client, admin, user_client, user
+        )
+        wrong_url = comment_url.replace(
+            f'/titles/{titles[0]["id"]}/', f'/titles/{titles[1]["id"]}/'
+        )
+        for response in (
+            client.get(wrong_url),
+            user_client.patch(wrong_url, data={'text': 'Ну'}),
+        ):
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что комментарий недоступен по адресу '
+                'чужого произведения.'
+            )
+        response = client.get(wrong_url.rsplit('/', 2)[0] + '/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == [], (
+            'Проверьте, что комментарии отзыва не выдаются '
+            'по адресу чужого произведения.'
+        )
+        response = user_client.post(
+            wrong_url.rsplit('/', 2)[0] + '/', data={'text': 'Ну'}
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что комментарий нельзя создать к отзыву '
+            'по адресу чужого произведения.'
+        )
+
+    def test_04_title_delete_queries(self, admin_client, django_user_model,
+                                     django_assert_num_queries):
+        titles, _ = self.create_discussed_titles(
+            admin_client, django_user_model
+        )
+        with django_assert_num_queries(11):
+            response = admin_client.delete(
+                f'/api/v1/titles/{titles[0]["id"]}/'
+            )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not Review.objects.filter(title_id=titles[0]['id']).exists()
+        assert Review.objects.filter(title_id=titles[1]['id']).exists(), (
+            'Проверьте, что удаление произведения не затрагивает '
+            'отзывы других произведений.'
+        )
+
+    def test_05_category_delete_queries(self, admin_client,
+                                        django_user_model,
+                                        django_assert_num_queries):
+        titles, categories = self.create_discussed_titles(
+            admin_client, django_user_model
+        )
+        with django_assert_num_queries(12):
+            response = admin_client.delete(
+                f'/api/v1/categories/{categories[1]["slug"]}/'
+            )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not Comment.objects.filter(
+            review__title_id=titles[1]['id']
+        ).exists(), (
+            'Проверьте, что комментарии удаляются вместе с категорией '
+            'произведения.'
+        )
@@ -0,0 +1,135 @@
+import csv
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from tests.utils import create_titles
+from users.tokens import access_token_for
+
+
+def token_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {access_token_for(user)}')
+    return client
+
+
+def user_lookups(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT "users_user"."id"')
+        and 'WHERE "users_user"."id" =' in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21TokenAuth:
+
+    URL_TOKEN = '/api/v1/auth/token/'
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_token_contains_role(self, client, user):
+        user.confirmation_code = 'code'
+        user.save()
+        response = client.post(self.URL_TOKEN, data={
+            'username': user.username, 'confirmation_code': 'code'
+        })
+        assert response.status_code == HTTPStatus.OK
+        token = AccessToken(response.json()['token'])
+        assert token['role'] == user.role and not token['is_superuser'], (
+            f'Проверьте, что токен от `{self.URL_TOKEN}` содержит роль '
+            'пользователя и признак суперпользователя.'
+        )
+
+    def test_02_permissions_without_user_lookup(
+        self, admin, django_assert_num_queries
+    ):
+        client = token_client(admin)
+        with django_assert_num_queries(2) as context:
+            response = client.get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.OK
+        assert not user_lookups(context), (
+            'Проверьте, что права администратора проверяются по токену, '
+            'без запроса пользователя из базы.'
+        )
+        with django_assert_num_queries(2) as context:
+            response = client.post(
+                '/api/v1/genres/', data={'name': 'Жанр', 'slug': 'genre'}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        assert not user_lookups(context)
+
+    def test_03_lazy_user(self, user, admin_client):
+        client = token_client(user)
+        response = client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['email'] == user.email, (
+            'Проверьте, что эндпоинт `me` работает с токеном с ролью.'
+        )
+        titles, _, _ = create_titles(admin_client)
+        response = client.post(
+            f'{self.TITLES_URL}{titles[0]["id"]}/reviews/',
+            data={'text': 'Ого', 'score': 8}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json()['author'] == user.username
+
+    def test_04_revoked_after_role_change(self, admin, user):
+        client = token_client(user)
+        assert client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        response = token_client(admin).patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert client.get('/api/v1/users/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что после смены роли ранее выданный токен '
+            'пользователя отклоняется.'
+        )
+        user.refresh_from_db()
+        assert token_client(user).get('/api/v1/users/').status_code == (
+            HTTPStatus.OK
+        ), 'Проверьте, что новый токен содержит новую роль.'
+
+    def test_05_revoked_after_delete(self, admin, user):
+        client = token_client(user)
+        token_client(admin).delete(f'/api/v1/users/{user.username}/')
+        assert client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что токен удалённого пользователя отклоняется.'
+
+    def test_06_revoked_after_upsert(self, admin, user, tmp_path):
+        client, admin_client = token_client(user), token_client(admin)
+        fields = ('id', 'username', 'email', 'role', 'bio', 'first_name',
+                  'last_name')
+        with open(tmp_path / 'users.csv', 'w', newline='',
+                  encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(fields)
+            writer.writerow([getattr(admin, name) for name in fields])
+            writer.writerow([
+                'moderator' if name == 'role' else getattr(user, name)
+                for name in fields
+            ])
+        call_command(
+            'import_csv', data_dir=tmp_path, files=['users.csv'],
+            upsert=True, stdout=StringIO()
+        )
+        assert client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), (
+            'Проверьте, что после смены роли командой '
+            '`import_csv --upsert` ранее выданный токен отклоняется.'
+        )
+        assert admin_client.get('/api/v1/users/').status_code == (
+            HTTPStatus.OK
+        ), (
+            'Проверьте, что `import_csv --upsert` не отзывает токены '
+            'пользователей, данные которых не изменились.'
+        )
@@ -0,0 +1,129 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from users.models import OutboxEmail
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Outbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def signup(self, client, count):
+        for idx in range(count):
+            client.post(self.URL_SIGNUP, data={
+                'email': f'user{idx}@yamdb.fake', 'username': f'user{idx}'
+            })
+
+    def test_01_signup_enqueues_email(self, client, django_user_model):
+        outbox_before_count = len(mail.outbox)
+        self.signup(client, 1)
+        assert len(mail.outbox) == outbox_before_count, (
+            f'Проверьте, что `{self.URL_SIGNUP}` не отправляет письмо '
+            'во время запроса.'
+        )
+        email = OutboxEmail.objects.get()
+        assert email.recipient == 'user0@yamdb.fake' and email.sent_at is None
+        user = django_user_model.objects.get(username='user0')
+        assert user.confirmation_code in email.message, (
+            'Проверьте, что письмо в очереди содержит код подтверждения.'
+        )
+
+    def test_02_worker_sends_in_batches(self, client):
+        self.signup(client, 5)
+        outbox_before_count = len(mail.outbox)
+        output = StringIO()
+        with mock.patch.object(
+            EmailBackend, 'open', autospec=True
+        ) as open_connection:
+            call_command(
+                'send_outbox', batch_size=2, workers=2, stdout=output
+            )
+        assert len(mail.outbox) == outbox_before_count + 5, (
+            'Проверьте, что команда `send_outbox` отправляет все письма '
+            'из очереди.'
+        )
+        assert open_connection.call_count <= 2, (
+            'Проверьте, что каждый поток переиспользует одно соединение.'
+        )
+        assert not OutboxEmail.objects.pending().exists()
+        assert 'очередь пуста' in output.getvalue()
+        call_command('send_outbox', stdout=StringIO())
+        assert len(mail.outbox) == outbox_before_count + 5, (
+            'Проверьте, что отправленные письма не отправляются повторно.'
+        )
+
+    def test_03_retry_with_backoff(self, client):
+        self.signup(client, 2)
+        outbox_before_count = len(mail.outbox)
+        with mock.patch.object(
+            EmailBackend, 'send_messages', side_effect=OSError('нет связи')
+        ):
+            call_command('send_outbox', stdout=StringIO())
+        emails = list(OutboxEmail.objects.all())
+        assert all(
+            email.attempts == 1 and email.sent_at is None
+            and email.last_error == 'нет связи'
+            and email.next_attempt_at > email.created_at
+            for email in emails
+        ), (
+            'Проверьте, что неудачная отправка увеличивает число попыток '
+            'и откладывает следующую попытку.'
+        )
+        call_command('send_outbox', stdout=StringIO())
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что повтор не выполняется до истечения паузы.'
+        )
+        OutboxEmail.objects.update(next_attempt_at=emails[0].created_at)
+        call_command('send_outbox', stdout=StringIO())
+        assert len(mail.outbox) == outbox_before_count + 2
+
+    def test_04_send_after_claim_commit(self, client):
+        self.signup(client, 2)
+        claimed = []
+
+        def send_messages(backend, messages):
+            # Поток отправки видит только зафиксированные изменения.
+            claimed.append(OutboxEmail.objects.filter(
+                claimed_until__isnull=False, sent_at__isnull=True
+            ).count())
+            return len(messages)
+
+        with mock.patch.object(
+            EmailBackend, 'send_messages', autospec=True,
+            side_effect=send_messages
+        ):
+            call_command('send_outbox', workers=1, stdout=StringIO())
+        assert claimed == [2, 2], (
+            'Проверьте, что письма забираются в отдельной транзакции '
+            'до отправки, а не отправляются внутри неё.'
+        )
+        assert not OutboxEmail.objects.filter(
+            claimed_until__isnull=False
+        ).exists()
+
+    def test_05_claimed_emails_skipped(self, client):
+        self.signup(client, 1)
+        outbox_before_count = len(mail.outbox)
+        lease = timezone.now() + timedelta(minutes=1)
+        OutboxEmail.objects.update(claimed_until=lease)
+        call_command('send_outbox', stdout=StringIO())
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что письма, забранные другим обработчиком, '
+            'не отправляются повторно до истечения срока.'
+        )
+        OutboxEmail.objects.update(
+            claimed_until=timezone.now() - timedelta(seconds=1)
+        )
+        call_command('send_outbox', stdout=StringIO())
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что письма упавшего обработчика отправляются '
+            'после истечения срока.'
+        )
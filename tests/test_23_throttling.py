@@ -0,0 +1,112 @@
+import json
+import re
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.settings import api_settings
+
+from api.throttling import TokenBucketThrottle
+
+
+def throttle_rates(**rates):
+    return override_settings(REST_FRAMEWORK={
+        **api_settings.user_settings,
+        'DEFAULT_THROTTLE_RATES': rates,
+    })
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Throttling:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    def signup(self, client, idx, username=None, **extra):
+        return client.post(self.URL_SIGNUP, data={
+            'email': f'user{idx}@yamdb.fake',
+            'username': username or f'user{idx}',
+        }, **extra)
+
+    def test_01_signup_per_username(self, client):
+        with throttle_rates(signup_ip='100/min', signup_username='2/min'):
+            for _ in range(2):
+                assert self.signup(client, 0).status_code == HTTPStatus.OK
+            response = self.signup(client, 0)
+            assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+                f'Проверьте, что частые запросы к `{self.URL_SIGNUP}` '
+                'с одним username возвращают ответ со статусом 429.'
+            )
+            assert int(response['Retry-After']) > 0, (
+                'Проверьте, что ответ со статусом 429 содержит заголовок '
+                '`Retry-After`.'
+            )
+            assert self.signup(client, 1).status_code == HTTPStatus.OK
+
+    def test_02_signup_per_ip(self, client):
+        with throttle_rates(signup_ip='2/min', signup_username='100/min'):
+            for idx in range(2):
+                assert self.signup(client, idx).status_code == HTTPStatus.OK
+            assert self.signup(client, 2).status_code == (
+                HTTPStatus.TOO_MANY_REQUESTS
+            ), (
+                f'Проверьте, что частые запросы к `{self.URL_SIGNUP}` '
+                'с одного IP возвращают ответ со статусом 429.'
+            )
+            assert self.signup(
+                client, 3, REMOTE_ADDR='198.51.100.1'
+            ).status_code == HTTPStatus.OK
+
+    def test_03_token(self, client, user):
+        data = {'username': user.username, 'confirmation_code': 'wrong'}
+        with throttle_rates(token_ip='100/min', token_username='1/min'):
+            assert client.post(self.URL_TOKEN, data=data).status_code == (
+                HTTPStatus.BAD_REQUEST
+            )
+            assert client.post(self.URL_TOKEN, data=data).status_code == (
+                HTTPStatus.TOO_MANY_REQUESTS
+            ), (
+                f'Проверьте, что перебор кодов через `{self.URL_TOKEN}` '
+                'ограничен.'
+            )
+
+    def test_04_refill(self, client, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(
+            TokenBucketThrottle, 'timer', staticmethod(lambda: now[0])
+        )
+        with throttle_rates(signup_username='1/min'):
+            assert self.signup(client, 0).status_code == HTTPStatus.OK
+            assert self.signup(client, 0).status_code == (
+                HTTPStatus.TOO_MANY_REQUESTS
+            )
+            now[0] += 60
+            assert self.signup(client, 0).status_code == HTTPStatus.OK, (
+                'Проверьте, что корзина пополняется со временем.'
+            )
+
+    def test_05_benchmark(self):
+        output = StringIO()
+        call_command(
+            'benchmark_throttle', requests=50, budget_us=10 ** 9,
+            stdout=output
+        )
+        assert re.match(
+            r'50 запросов: в среднем [\d.]+ мкс, p99 [\d.]+ мкс, '
+            r'бюджет \d+ мкс', output.getvalue()
+        ), (
+            'Проверьте, что `benchmark_throttle` выводит среднее время, '
+            'p99 и бюджет.'
+        )
+
+    def test_06_non_object_body(self, client):
+        for url, data in ((self.URL_SIGNUP, [1, 2]), (self.URL_TOKEN, 'x')):
+            response = client.post(
+                url, data=json.dumps(data), content_type='application/json'
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                f'Проверьте, что POST-запрос к `{url}` с телом JSON, '
+                'не являющимся объектом, возвращает ответ со статусом 400.'
+            )
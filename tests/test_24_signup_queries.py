@@ -0,0 +1,80 @@
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from django.db import IntegrityError
+
+from api.serializers import UserRegistrationSerializer
+from users.models import OutboxEmail
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24SignupQueries:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    DATA = {'email': 'valid@yamdb.fake', 'username': 'valid_username'}
+
+    def writes(self, context):
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith(('INSERT', 'UPDATE'))
+        ]
+
+    def reads(self, context):
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+        ]
+
+    def test_01_new_user(self, client, django_user_model,
+                         django_assert_max_num_queries):
+        with django_assert_max_num_queries(4) as context:
+            response = client.post(self.URL_SIGNUP, data=self.DATA)
+        assert response.status_code == HTTPStatus.OK
+        assert len(self.reads(context)) == 1, (
+            'Проверьте, что при регистрации username и email проверяются '
+            'одним запросом.'
+        )
+        assert len(self.writes(context)) == 2, (
+            'Проверьте, что регистрация записывает только пользователя '
+            'и письмо в очередь.'
+        )
+        assert django_user_model.objects.filter(**self.DATA).exists()
+
+    def test_02_existing_user(self, client, django_user_model,
+                              django_assert_max_num_queries):
+        client.post(self.URL_SIGNUP, data=self.DATA)
+        code = django_user_model.objects.get().confirmation_code
+        with django_assert_max_num_queries(4) as context:
+            response = client.post(self.URL_SIGNUP, data=self.DATA)
+        assert response.status_code == HTTPStatus.OK
+        assert len(self.reads(context)) == 1
+        assert len(self.writes(context)) == 2
+        user = django_user_model.objects.get()
+        assert user.confirmation_code != code, (
+            'Проверьте, что повторная регистрация обновляет код '
+            'подтверждения.'
+        )
+        assert user.confirmation_code in OutboxEmail.objects.latest(
+            'id'
+        ).message
+
+    def test_03_concurrent_signup(self, client, django_user_model):
+        original = UserRegistrationSerializer.create
+        calls = []
+
+        def create(serializer, validated_data):
+            calls.append(validated_data)
+            if len(calls) == 1:
+                raise IntegrityError('UNIQUE constraint failed')
+            return original(serializer, validated_data)
+
+        with mock.patch.object(UserRegistrationSerializer, 'create', create):
+            response = client.post(self.URL_SIGNUP, data=self.DATA)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что при одновременной регистрации с тем же username '
+            'запрос повторяет проверку, а не завершается ошибкой.'
+        )
+        assert len(calls) == 2
+        assert django_user_model.objects.count() == 1
+        assert OutboxEmail.objects.count() == 1
@@ -0,0 +1,132 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS
+
+from api.pagination import EstimatedCountPagination
+from api_yamdb.replicas import ReplicaRouter
+from reviews.models import Review, Title
+from tests.utils import create_single_review, create_titles
+
+REPLICA = 'replica'
+
+
+@pytest.fixture(autouse=True)
+def replica_settings(settings):
+    settings.REPLICA_DATABASES = [REPLICA]
+    settings.REPLICA_PIN_SECONDS = 5
+
+
+def sync_replicas():
+    call_command('sync_replicas', stdout=StringIO())
+
+
+@pytest.mark.django_db(transaction=True, databases=[DEFAULT_DB_ALIAS, REPLICA])
+class Test25Replicas:
+    """
+    Основная база и реплика — две отдельные базы SQLite;
+    реплика отстаёт от основной до запуска sync_replicas.
+    """
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def count(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        return response.json()['count']
+
+    def test_01_safe_reads_use_replica(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        sync_replicas()
+        Title.objects.filter(pk=titles[0]['id']).delete()
+        for url in (
+            self.TITLES_URL, '/api/v1/genres/', '/api/v1/categories/'
+        ):
+            assert self.count(client, url) == self.count(
+                admin_client, url
+            ) + (url == self.TITLES_URL), (
+                'Проверьте, что GET-запросы к произведениям, жанрам '
+                'и категориям читают данные из реплики.'
+            )
+        response = client.get(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что детальный GET-запрос к произведению '
+            'читает данные из реплики.'
+        )
+        sync_replicas()
+        assert self.count(client, self.TITLES_URL) == len(titles) - 1
+
+    def test_02_other_views_use_primary(self, admin_client,
+                                        django_user_model):
+        sync_replicas()
+        django_user_model.objects.create_user(
+            username='newcomer', email='newcomer@yamdb.fake'
+        )
+        response = admin_client.get('/api/v1/users/', {'search': 'newcomer'})
+        assert response.json()['count'] == 1, (
+            'Проверьте, что представления без `replica_reads` '
+            'читают данные из основной базы.'
+        )
+
+    def test_03_pin_after_write(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        sync_replicas()
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/reviews/'
+        create_single_review(user_client, titles[0]['id'], 'Ого', 8)
+        assert self.count(user_client, url) == 1, (
+            'Проверьте, что после записи клиент некоторое время '
+            'читает из основной базы и видит свои изменения.'
+        )
+        assert self.count(client, url) == 0, (
+            'Проверьте, что закрепление за основной базой действует '
+            'только для клиента, выполнившего запись.'
+        )
+
+    def test_04_no_pin_after_failed_write(self, admin_client, user_client,
+                                          user):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/reviews/'
+        review = Review.objects.create(
+            title_id=titles[0]['id'], author=user, text='Ого', score=8
+        )
+        sync_replicas()
+        review.delete()
+        response = user_client.post(url, data={'score': 100})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert self.count(user_client, url) == 1, (
+            'Проверьте, что неуспешный запрос не закрепляет клиента '
+            'за основной базой.'
+        )
+
+    def test_05_router(self, settings):
+        router = ReplicaRouter()
+        assert router.db_for_write(Title) == DEFAULT_DB_ALIAS
+        assert router.db_for_read(Title) is None, (
+            'Проверьте, что вне запроса чтение идёт в основную базу.'
+        )
+        assert not router.allow_migrate(REPLICA, 'reviews')
+        assert router.allow_migrate(DEFAULT_DB_ALIAS, 'reviews')
+
+    def test_06_caches_filled_from_primary(self, client, admin_client,
+                                           monkeypatch):
+        titles, _, genres = create_titles(admin_client)
+        sync_replicas()
+        response = admin_client.post(
+            '/api/v1/genres/', data={'name': 'Сатира', 'slug': 'satire'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert self.count(client, '/api/v1/genres/') == len(genres) + 1, (
+            'Проверьте, что список жанров для кеша читается из основной '
+            'базы, а не из отстающей реплики.'
+        )
+        monkeypatch.setattr(EstimatedCountPagination, 'exact_count_limit', 1)
+        Title.objects.create(name='Новое', year=2000, description='Ну')
+        assert self.count(client, self.TITLES_URL) == len(titles) + 1, (
+            'Проверьте, что оценка числа произведений для кеша '
+            'считается в основной базе.'
+        )
@@ -0,0 +1,138 @@
+import csv
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.models import Review, Title
+from tests.utils import create_titles
+
+
+def write_reviews(data_dir, rows):
+    with open(data_dir / 'review.csv', 'w', newline='',
+              encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(
+            ('id', 'title_id', 'text', 'author', 'score', 'pub_date')
+        )
+        writer.writerows(rows)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26ImportCsv:
+
+    def test_01_import_touches_titles(self, client, admin_client, user,
+                                      tmp_path):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = client.get(url)['ETag']
+        write_reviews(tmp_path, [
+            (1, titles[0]['id'], 'Отзыв', user.pk, 7, '2020-01-01T00:00:00Z')
+        ])
+        call_command(
+            'import_csv', data_dir=tmp_path, files=['review.csv'],
+            stdout=StringIO()
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после загрузки отзывов командой `import_csv` '
+            'условный GET-запрос к произведению со старым `If-None-Match` '
+            'возвращает ответ со статусом 200.'
+        )
+        assert response.json()['rating'] == 7
+
+    def test_02_score_checked_without_pool(self, admin_client, user,
+                                           tmp_path):
+        titles, _, _ = create_titles(admin_client)
+        write_reviews(tmp_path, [
+            (1, titles[0]['id'], 'Отзыв', user.pk, 11, '2020-01-01T00:00:00Z')
+        ])
+        with pytest.raises(CommandError):
+            call_command(
+                'import_csv', data_dir=tmp_path, files=['review.csv'],
+                stdout=StringIO()
+            )
+        assert not Review.objects.exists(), (
+            'Проверьте, что `import_csv` без пула процессов '
+            'не загружает отзывы с недопустимой оценкой.'
+        )
+
+    def test_03_pool_parses_records(self, admin_client, django_user_model,
+                                    tmp_path):
+        titles, _, _ = create_titles(admin_client)
+        authors = [
+            django_user_model.objects.create_user(
+                username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+            )
+            for idx in range(5)
+        ]
+        rows = [
+            (
+                idx, titles[idx % len(titles)]['id'],
+                f'Отзыв "{idx}",\nв две строки', author.pk, idx % 10 + 1,
+                '2020-01-01T00:00:00Z'
+            )
+            for idx, author in enumerate(authors, 1)
+        ]
+        write_reviews(tmp_path, rows)
+        call_command(
+            'import_csv', data_dir=tmp_path, files=['review.csv'],
+            workers=2, chunk_size=2, stdout=StringIO()
+        )
+        assert list(Review.objects.order_by('id').values_list(
+            'id', 'text', 'score'
+        )) == [(idx, text, score) for idx, _, text, _, score, _ in rows], (
+            'Проверьте, что `import_csv --workers` разбирает записи '
+            'с переводами строк и кавычками в значениях.'
+        )
+
+    def test_04_pub_date_kept(self, admin_client, user, tmp_path):
+        titles, _, _ = create_titles(admin_client)
+        write_reviews(tmp_path, [
+            (1, titles[0]['id'], 'Отзыв', user.pk, 7, '2020-01-01T00:00:00Z')
+        ])
+        call_command(
+            'import_csv', data_dir=tmp_path, files=['review.csv'],
+            stdout=StringIO()
+        )
+        assert Review.objects.get(pk=1).pub_date.year == 2020, (
+            'Проверьте, что `import_csv` сохраняет дату публикации '
+            'отзыва из файла.'
+        )
+        write_reviews(tmp_path, [
+            (1, titles[0]['id'], 'Отзыв', user.pk, 7, '2019-01-01T00:00:00Z'),
+            (2, titles[1]['id'], 'Отзыв', user.pk, 5, '2018-01-01T00:00:00Z'),
+        ])
+        call_command(
+            'import_csv', data_dir=tmp_path, files=['review.csv'],
+            upsert=True, stdout=StringIO()
+        )
+        assert list(Review.objects.order_by('id').values_list(
+            'pub_date__year', flat=True
+        )) == [2019, 2018], (
+            'Проверьте, что `import_csv --upsert` сохраняет дату '
+            'публикации новых и изменённых отзывов из файла.'
+        )
+
+    def test_05_upsert_updates_description(self, admin_client, tmp_path):
+        titles, categories, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        with open(tmp_path / 'titles.csv', 'w', newline='',
+                  encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(('id', 'name', 'year', 'category', 'description'))
+            writer.writerow((
+                title.pk, title.name, title.year, title.group_id,
+                'Новое описание'
+            ))
+        call_command(
+            'import_csv', data_dir=tmp_path, files=['titles.csv'],
+            upsert=True, stdout=StringIO()
+        )
+        assert Title.objects.get(
+            pk=title.pk
+        ).description == 'Новое описание', (
+            'Проверьте, что `import_csv --upsert` обновляет '
+            'описание произведения.'
+        )
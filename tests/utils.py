@@ -244,6 +244,14 @@ def create_titles(admin_client):
     return result, categories, genres
 
 
+def create_rated_titles(admin_client, user_client, moderator_client):
+    titles, categories, genres = create_titles(admin_client)
+    create_single_review(user_client, titles[0]['id'], 'Так себе', 3)
+    create_single_review(user_client, titles[1]['id'], 'Шедевр', 10)
+    create_single_review(moderator_client, titles[1]['id'], 'Ого', 8)
+    return titles, categories, genres
+
+
 def create_reviews(admin_client, authors_map):
     titles, _, _ = create_titles(admin_client)
     result = []